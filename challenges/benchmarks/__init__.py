@@ -0,0 +1,13 @@
+"""
+Benchmarks for the SnarkyAI engine.
+
+Run them from the challenges directory so the engine modules are importable:
+
+    python -m benchmarks.keywords
+
+benchmarks.suite times every stage over the generated corpora in
+benchmarks.corpora and gates on a saved baseline:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json
+"""
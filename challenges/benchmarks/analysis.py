@@ -0,0 +1,129 @@
+"""
+Compares the one-pass TextAnalysis checks against the old rescan-per-check ones.
+
+    python -m benchmarks.analysis [--size 5000] [--repeat 5]
+
+legacy_candidates() runs the checks the way they were written before
+text_analysis.py: a findall for the nonsense check, a re.search per
+misspelling, the grammar regexes over the raw text and a fresh tokenization in
+the keyword matcher. Both versions run over the same sanitized corpus (keyword
+questions in several casings plus the sanitizer's markup and emoji fragments);
+any input where the candidates differ is reported and fails the run.
+"""
+import argparse
+import random
+import re
+import sys
+import timeit
+
+import lexicon
+from SnarkyAI import SnarkyAI
+from benchmarks import keywords, sanitizer
+from manual_sanitation import sanitize_expressive_fort_knox
+
+
+def legacy_candidates(ai, raw_input, normalized_input):
+    registry = ai.registry
+    picks = []
+
+    # Grammar and style, over the raw input.
+    text = raw_input
+    grammar = None
+    if len(text) > 5 and not re.search(r'[?!.]$', text.strip()):
+        grammar = registry.not_a_question
+    elif text.isupper() and len(text) > 5:
+        grammar = registry.yelling
+    elif re.search(r'[a-z]', text) and not re.search(r'[A-Z]', text):
+        grammar = registry.no_caps
+    elif '???' in text or '!!!' in text or '?!' in text:
+        grammar = registry.punctuation
+    elif re.search(r'\byour\s+(wrong|stupid|dumb|bad|lame|the worst)\b', text, re.IGNORECASE):
+        grammar = "I think you meant YOU'RE. As in 'you're an enormous idiot.'"
+    elif re.search(r'\btheir\s+(going|coming|is|was|are)\b', text, re.IGNORECASE):
+        grammar = "THEY'RE. T-H-E-Y-'-R-E. It's a contraction! Did you learn nothing from elementary school?"
+    if grammar:
+        picks.append(grammar)
+
+    # Misspellings, one regex each.
+    for word, (_, response) in registry.misspellings.items():
+        if re.search(r"\b" + re.escape(word) + r"\b", normalized_input):
+            picks.append(tuple(insult + response for insult in registry.misspelling_insults))
+            break
+
+    # Nonsense.
+    words = re.findall(r'\b[a-z]{3,}\b', normalized_input)
+    if words:
+        unknown = sum(word not in ai.lexicon for word in words)
+        if unknown / len(words) > 0.05:
+            picks.append(registry.nonsense)
+
+    # Keywords, tokenizing again.
+    topics = registry.keyword_matcher.match(normalized_input)
+    spread = tuple(
+        response for name, responses in registry.topic_responses if name in topics
+        for response in responses
+    )
+
+    if picks or spread:
+        return tuple(picks), spread
+    return None
+
+
+def build_corpus(size, seed=0):
+    """Sanitized inputs: keyword questions in mixed casing plus sanitizer fragments."""
+    rng = random.Random(seed)
+    texts = []
+    for text in keywords.build_corpus(size, seed):
+        style = rng.random()
+        if style < 0.3:
+            text = text.capitalize()
+        elif style < 0.4:
+            text = text.upper()
+        texts.append(text)
+    texts += ["Your wrong.", "YOUR THE WORST!", "Their going home?", "their is no way",
+              "İt is THEİR problem.", "Wat r u doing?!", "hwat is tha fooniest anminal"]
+    texts += sanitizer.build_corpus(size // 2, seed)
+    corpus = []
+    for text in texts:
+        raw = sanitize_expressive_fort_knox(text, max_len=300)
+        if raw:
+            corpus.append((raw, raw.lower()))
+    return corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the one-pass text analysis.")
+    parser.add_argument("--size", type=int, default=5000, help="number of generated inputs")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per implementation")
+    args = parser.parse_args(argv)
+
+    ai = SnarkyAI(lexicon=lexicon.common_words())
+    corpus = build_corpus(args.size)
+
+    mismatches = [
+        raw for raw, normalized in corpus
+        if legacy_candidates(ai, raw, normalized) != ai._collect_candidates(raw, normalized)
+    ]
+    for raw in mismatches[:10]:
+        print(f"MISMATCH {raw!r}")
+
+    def run_legacy():
+        for raw, normalized in corpus:
+            legacy_candidates(ai, raw, normalized)
+
+    def run_analysis():
+        for raw, normalized in corpus:
+            ai._collect_candidates(raw, normalized)
+
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=args.repeat))
+    analysis = min(timeit.repeat(run_analysis, number=1, repeat=args.repeat))
+
+    print(f"inputs:     {len(corpus)} ({len(mismatches)} mismatches)")
+    print(f"legacy:     {legacy / len(corpus) * 1e6:8.2f} us/input")
+    print(f"analysis:   {analysis / len(corpus) * 1e6:8.2f} us/input")
+    print(f"speedup:    {legacy / analysis:8.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
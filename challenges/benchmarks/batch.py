@@ -0,0 +1,70 @@
+"""
+Compares SnarkyAI.get_responses against a Python loop over get_response.
+
+    python -m benchmarks.batch [--size 5000] [--sessions 50] [--repeat 3]
+
+Both runs start from the same seed and fresh instances, so besides timing them
+this checks that the batch replies are exactly the replies the loop gives.
+"""
+import argparse
+import random
+import sys
+import timeit
+
+from SnarkyAI import SnarkyAI
+from benchmarks.keywords import build_corpus
+
+
+def build_items(size, sessions, seed=0):
+    """A replay-like mix: popular questions recur, most items carry a session id."""
+    rng = random.Random(seed)
+    questions = build_corpus(max(size // 4, 1), seed=seed)
+    items = []
+    for _ in range(size):
+        question = rng.choice(questions)
+        if rng.random() < 0.2:
+            items.append(question)
+        else:
+            items.append((f"session-{rng.randrange(sessions)}", question))
+    return items
+
+
+def run_loop(items):
+    ai = SnarkyAI()
+    return [
+        ai.get_response(item) if isinstance(item, str) else ai.get_response(item[1], session_id=item[0])
+        for item in items
+    ]
+
+
+def run_batch(items):
+    return SnarkyAI().get_responses(items)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the batch API.")
+    parser.add_argument("--size", type=int, default=5000, help="number of items")
+    parser.add_argument("--sessions", type=int, default=50, help="number of distinct sessions")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per approach")
+    args = parser.parse_args(argv)
+
+    items = build_items(args.size, args.sessions)
+
+    random.seed(0)
+    loop_replies = run_loop(items)
+    random.seed(0)
+    batch_replies = run_batch(items)
+    mismatches = sum(a != b for a, b in zip(loop_replies, batch_replies))
+
+    loop = min(timeit.repeat(lambda: run_loop(items), number=1, repeat=args.repeat))
+    batch = min(timeit.repeat(lambda: run_batch(items), number=1, repeat=args.repeat))
+
+    print(f"items:      {len(items)} ({mismatches} mismatches)")
+    print(f"loop:       {loop / len(items) * 1e6:8.2f} us/item")
+    print(f"batch:      {batch / len(items) * 1e6:8.2f} us/item")
+    print(f"speedup:    {loop / batch:8.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
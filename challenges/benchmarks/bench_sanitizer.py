@@ -0,0 +1,33 @@
+"""
+pytest-benchmark suite for sanitize_expressive_fort_knox.
+
+    python -m pytest benchmarks/bench_sanitizer.py --benchmark-autosave
+    python -m pytest benchmarks/bench_sanitizer.py --benchmark-compare --benchmark-compare-fail=mean:15%
+
+Measures per-call latency for each class of input the engine sees. Saved runs
+(.benchmarks/) let later changes be compared against them and fail when the
+mean for any input class regresses beyond the allowed margin.
+"""
+import pytest
+
+from manual_sanitation import sanitize_expressive_fort_knox
+
+MAX_LEN = 300
+
+INPUT_CLASSES = {
+    "plain_ascii": "Why is the sky blue and can you tell me about the weather tomorrow?",
+    "emoji_heavy": "Is this fine? 😀🔥👍🏽 (╯°□°)╯︵ ┻━┻ 🎸🎮🐱 lol 🤖💀✨ >:P",
+    "tag_heavy": (
+        "<b>hi</b><script>alert(1)</script><style>p{color:red}</style>"
+        "<img src=x onerror=alert(1)><a href='javascript:alert(2)' style='x'>click</a>"
+    ),
+    "sql_ish": "1; DROP TABLE users; -- SELECT * FROM secrets UNION SELECT /* x */ password;",
+    "max_length": ("The quick brown fox jumps over the lazy dog. " * 7)[:MAX_LEN],
+}
+
+
+@pytest.mark.parametrize("text", INPUT_CLASSES.values(), ids=INPUT_CLASSES.keys())
+def test_sanitize_latency(benchmark, text):
+    benchmark.group = "sanitize_expressive_fort_knox"
+    result = benchmark(sanitize_expressive_fort_knox, text, MAX_LEN)
+    assert "<script" not in result.lower()
@@ -0,0 +1,64 @@
+"""
+Measures the response cache on replay-like traffic.
+
+    python -m benchmarks.cache [--size 20000] [--distinct 2000] [--repeat 3]
+
+The same items (popular questions recurring across many sessions) are answered
+once with the default ResponseCache and once with caching turned off, from the
+same seed. The replies must be identical; the run prints the time per request
+for both and the cache's hit/miss/eviction counters.
+"""
+import argparse
+import random
+import sys
+import timeit
+
+from SnarkyAI import SnarkyAI
+from benchmarks.keywords import build_corpus
+from response_cache import ResponseCache
+
+
+def build_items(size, distinct, sessions=500, seed=0):
+    """Questions drawn with a skew towards the popular ones, each in some session."""
+    rng = random.Random(seed)
+    questions = build_corpus(distinct, seed=seed)
+    weights = [1 / (rank + 1) for rank in range(len(questions))]
+    picked = rng.choices(questions, weights=weights, k=size)
+    return [(f"session-{rng.randrange(sessions)}", question) for question in picked]
+
+
+def run(items, cache):
+    ai = SnarkyAI(response_cache=cache)
+    replies = [ai.get_response(question, session_id=session) for session, question in items]
+    return ai, replies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the response cache.")
+    parser.add_argument("--size", type=int, default=20000, help="number of requests")
+    parser.add_argument("--distinct", type=int, default=2000, help="number of distinct questions")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs per configuration")
+    args = parser.parse_args(argv)
+
+    items = build_items(args.size, args.distinct)
+
+    random.seed(0)
+    cached_ai, cached = run(items, ResponseCache())
+    random.seed(0)
+    _, uncached = run(items, ResponseCache(max_entries=0))
+    mismatches = sum(a != b for a, b in zip(cached, uncached))
+
+    with_cache = min(timeit.repeat(lambda: run(items, ResponseCache()), number=1, repeat=args.repeat))
+    without = min(timeit.repeat(lambda: run(items, ResponseCache(max_entries=0)), number=1, repeat=args.repeat))
+
+    print(f"requests:   {len(items)} ({mismatches} mismatches)")
+    print(f"uncached:   {without / len(items) * 1e6:8.2f} us/request")
+    print(f"cached:     {with_cache / len(items) * 1e6:8.2f} us/request")
+    print(f"speedup:    {without / with_cache:8.2f}x")
+    for key, value in cached_ai.response_cache.stats().items():
+        print(f"  {key + ':':<14}{value}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
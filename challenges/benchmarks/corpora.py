@@ -0,0 +1,102 @@
+"""
+Seeded input corpora for the benchmark suite (see benchmarks/suite.py).
+
+    from benchmarks.corpora import build_corpora
+    corpora = build_corpora(size=2000, seed=0)   # {"realistic": [...], ...}
+
+Every corpus is a list of raw user inputs, regenerated identically from the
+same size and seed, so two runs of the suite time the same strings:
+
+    realistic    capitalized questions mixing topic terms and filler; popular
+                 ones recur
+    adversarial  markup, script and SQL fragments, control and bidi characters
+    textspeak    lower-case chat full of the registry's misspellings
+    max_length   inputs right at the 300-character cap and just past it
+    emoji        emoji-heavy questions, including skin tones and ZWJ sequences
+"""
+import random
+
+from benchmarks.keywords import FILLER, build_corpus
+from benchmarks.sanitizer import FRAGMENTS
+from snarky_registry import default_registry
+
+MAX_LEN = 300
+
+EMOJI = (
+    "😀", "😂", "🔥", "👍🏽", "🤖", "💀", "✨", "🎸", "🎮", "🐱", "🍕", "🚀",
+    "👨‍👩‍👧", "🏳️‍🌈", "🇺🇸", "❤️", "🙃", "(╯°□°)╯︵ ┻━┻", "¯\\_(ツ)_/¯",
+)
+PUNCTUATION = ("?", "?", "?", "!", ".", "", "?!", "??")
+
+
+def realistic(size, seed=0):
+    rng = random.Random(seed)
+    # Popular questions recur, as in real traffic (and as the response cache assumes).
+    questions = build_corpus(max(size // 4, 1), seed=seed)
+    corpus = []
+    for _ in range(size):
+        text = rng.choice(questions).strip()
+        if rng.random() < 0.7:
+            text = text[:1].upper() + text[1:]
+        corpus.append(text.rstrip("?!.,") + rng.choice(PUNCTUATION))
+    return corpus
+
+
+def adversarial(size, seed=0):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(3, 25)))[:MAX_LEN]
+        for _ in range(size)
+    ]
+
+
+def textspeak(size, seed=0):
+    rng = random.Random(seed)
+    slang = list(default_registry().misspellings)
+    corpus = []
+    for _ in range(size):
+        words = [
+            rng.choice(slang) if rng.random() < 0.4 else rng.choice(FILLER)
+            for _ in range(rng.randint(2, 12))
+        ]
+        corpus.append(" ".join(words) + rng.choice(("", "", "?", "!!", " lol")))
+    return corpus
+
+
+def max_length(size, seed=0):
+    rng = random.Random(seed)
+    sentences = build_corpus(64, seed=seed)
+    corpus = []
+    for i in range(size):
+        text = ""
+        while len(text) < MAX_LEN + 20:
+            text += rng.choice(sentences).capitalize() + "? "
+        # Alternate exactly-at-cap (runs the whole pipeline) with just-over (rejected early).
+        corpus.append(text[:MAX_LEN] if i % 2 == 0 else text[:MAX_LEN + 1 + rng.randrange(20)])
+    return corpus
+
+
+def emoji(size, seed=0):
+    rng = random.Random(seed)
+    questions = build_corpus(size, seed=seed)
+    corpus = []
+    for text in questions:
+        words = text.split()
+        for _ in range(rng.randint(1, 6)):
+            words.insert(rng.randint(0, len(words)), rng.choice(EMOJI))
+        corpus.append(" ".join(words)[:MAX_LEN])
+    return corpus
+
+
+CORPORA = {
+    "realistic": realistic,
+    "adversarial": adversarial,
+    "textspeak": textspeak,
+    "max_length": max_length,
+    "emoji": emoji,
+}
+
+
+def build_corpora(size=2000, seed=0, names=None):
+    """Returns {name: inputs} for the named corpora (all of them by default)."""
+    return {name: CORPORA[name](size, seed) for name in (names or CORPORA)}
@@ -0,0 +1,110 @@
+"""
+Compares the single-pass KeywordMatcher against the old one-regex-per-topic check.
+
+    python -m benchmarks.keywords [--size 5000] [--repeat 5]
+
+The legacy matcher is rebuilt from the registry's topic table exactly the way
+_check_keywords used to spell its patterns (r'\\b(a|b|c)\\b' per topic). Both
+matchers run over the same generated corpus; any input where their topic sets
+differ is reported and makes the run fail.
+"""
+import argparse
+import random
+import re
+import sys
+import timeit
+
+from snarky_registry import default_registry
+
+KEYWORD_TOPICS = default_registry().keyword_topics
+KEYWORD_MATCHER = default_registry().keyword_matcher
+
+FILLER = (
+    "the", "a", "is", "my", "your", "what", "why", "how", "do", "you", "think", "about",
+    "games", "gamer", "cats", "airport", "running", "42nd", "money's", "ai-powered",
+    "xboxes", "pets", "café", "naïve", "über", "don't", "it's", "re-run", "self_help",
+)
+PUNCTUATION = ("", "?", "!", ".", "?!", "...", ",")
+SEPARATORS = (" ", " ", " ", " ", "  ", "-", ", ", "\t")
+
+
+def legacy_topics(text, patterns=None):
+    """Returns the topic set using one re.search per topic, as before."""
+    patterns = patterns or build_legacy_patterns()
+    found = set()
+    for name, kind, test in patterns:
+        if test(text):
+            found.add(name)
+    return found
+
+
+def build_legacy_patterns():
+    patterns = []
+    for name, kind, terms in KEYWORD_TOPICS:
+        if kind == "words":
+            pattern = r"\b(" + "|".join(terms) + r")\b"
+            patterns.append((name, kind, lambda t, p=pattern: re.search(p, t)))
+        elif kind == "contains":
+            patterns.append((name, kind, lambda t, term=terms[0]: term in t))
+        elif kind == "prefix":
+            patterns.append((name, kind, lambda t, term=terms[0]: t.startswith(term)))
+        else:
+            patterns.append((name, kind, lambda t, p=terms[0]: re.search(p, t)))
+    return patterns
+
+
+def build_corpus(size, seed=0):
+    """Generates lower-cased questions mixing topic terms, near-misses and filler."""
+    rng = random.Random(seed)
+    vocabulary = [term for _, kind, terms in KEYWORD_TOPICS if kind != "regex" for term in terms]
+    vocabulary += ["3 + 4", "10*2", "7 -1"]
+
+    corpus = []
+    for _ in range(size):
+        words = []
+        for _ in range(rng.randint(1, 14)):
+            words.append(rng.choice(vocabulary) if rng.random() < 0.35 else rng.choice(FILLER))
+        text = words[0]
+        for word in words[1:]:
+            text += rng.choice(SEPARATORS) + word
+        corpus.append(text + rng.choice(PUNCTUATION))
+    return corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the keyword matcher.")
+    parser.add_argument("--size", type=int, default=5000, help="number of generated inputs")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per matcher")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.size)
+    patterns = build_legacy_patterns()
+
+    mismatches = [
+        text for text in corpus
+        if legacy_topics(text, patterns) != KEYWORD_MATCHER.match(text)
+    ]
+    for text in mismatches[:10]:
+        print(f"MISMATCH {text!r}: legacy={sorted(legacy_topics(text, patterns))} "
+              f"matcher={sorted(KEYWORD_MATCHER.match(text))}")
+
+    def run_legacy():
+        for text in corpus:
+            legacy_topics(text, patterns)
+
+    def run_matcher():
+        for text in corpus:
+            KEYWORD_MATCHER.match(text)
+
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=args.repeat))
+    matcher = min(timeit.repeat(run_matcher, number=1, repeat=args.repeat))
+
+    print(f"inputs:     {len(corpus)} ({len(mismatches)} mismatches)")
+    print(f"legacy:     {legacy / len(corpus) * 1e6:8.2f} us/input")
+    print(f"matcher:    {matcher / len(corpus) * 1e6:8.2f} us/input")
+    print(f"speedup:    {legacy / matcher:8.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
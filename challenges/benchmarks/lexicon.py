@@ -0,0 +1,115 @@
+"""
+Compares the Bloom filter lexicon against the exact word list.
+
+    python -m benchmarks.lexicon [--fp 0.01] [--size 20000]
+
+Reports, for the exact mapped lexicon, a plain Python set and the Bloom filter:
+memory per process, lookup time, how often the filter calls an unknown word
+common (per word), and how often that flips _check_nonsense's 5% verdict on a
+generated corpus of questions (per input).
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import timeit
+import tracemalloc
+
+from wordfreq import top_n_list
+
+import lexicon
+from SnarkyAI import SnarkyAI
+from benchmarks.keywords import build_corpus
+from text_analysis import TextAnalysis
+
+
+def out_of_vocabulary(size, seed=0):
+    """Real but rarer words just past the top-N list, plus typos and random letters."""
+    rng = random.Random(seed)
+    rarer = top_n_list(lexicon.DEFAULT_LANGUAGE, lexicon.DEFAULT_SIZE + size)[lexicon.DEFAULT_SIZE:]
+    words = list(rarer)
+    for _ in range(size):
+        words.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    return words
+
+
+def garble(text, rng):
+    """Swaps and drops letters in some words, like a hurried typist."""
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        if len(word) > 3 and rng.random() < 0.3:
+            letters = list(word)
+            j = rng.randrange(len(letters) - 1)
+            letters[j], letters[j + 1] = letters[j + 1], letters[j]
+            words[i] = "".join(letters)
+    return " ".join(words)
+
+
+def set_memory(words):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    words = set(words)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the Bloom lexicon with the exact one.")
+    parser.add_argument("--fp", type=float, default=lexicon.DEFAULT_FALSE_POSITIVE_RATE,
+                        help="Bloom filter false-positive rate")
+    parser.add_argument("--size", type=int, default=20000, help="corpus size")
+    args = parser.parse_args(argv)
+
+    exact_path = lexicon.lexicon_path()
+    bloom_path = lexicon.lexicon_path(mode="bloom", false_positive_rate=args.fp)
+    if not os.path.exists(exact_path):
+        lexicon.build_from_wordfreq(path=exact_path)
+    if not os.path.exists(bloom_path):
+        lexicon.build_from_wordfreq(path=bloom_path, mode="bloom", false_positive_rate=args.fp)
+
+    exact = lexicon.MappedLexicon(exact_path)
+    bloom = lexicon.BloomLexicon(bloom_path)
+    word_list = top_n_list(lexicon.DEFAULT_LANGUAGE, lexicon.DEFAULT_SIZE)
+
+    # --- Per word ---
+    unknown = [word for word in out_of_vocabulary(args.size // 2) if word not in exact]
+    false_positives = sum(word in bloom for word in unknown)
+    missed = sum(word not in bloom for word in word_list)
+
+    # --- Per input ---
+    rng = random.Random(1)
+    corpus = [garble(text, rng) if rng.random() < 0.5 else text for text in build_corpus(args.size)]
+    exact_ai = SnarkyAI(lexicon=exact)
+    bloom_ai = SnarkyAI(lexicon=bloom)
+    analyses = [TextAnalysis(text) for text in corpus]
+    flipped = sum(
+        (exact_ai._check_nonsense(analysis) is None) != (bloom_ai._check_nonsense(analysis) is None)
+        for analysis in analyses
+    )
+
+    # --- Cost ---
+    sample = (word_list[::50] + unknown[::10])[:2000]
+    python_set = set(word_list)
+
+    def lookups(words):
+        return min(timeit.repeat(lambda: [w in words for w in sample], number=1, repeat=5)) / len(sample)
+
+    print(f"bloom fp target:        {args.fp:g}")
+    print(f"unknown words checked:  {len(unknown)}")
+    print(f"  called common:        {false_positives} ({false_positives / len(unknown):.4%})")
+    print(f"known words missed:     {missed}")
+    print(f"inputs checked:         {len(corpus)}")
+    print(f"  nonsense verdict flipped: {flipped} ({flipped / len(corpus):.4%})")
+    print(f"memory  python set:     {set_memory(word_list) / 1024:10.1f} KB per process")
+    print(f"        mapped exact:   {os.path.getsize(exact_path) / 1024:10.1f} KB shared")
+    print(f"        bloom:          {bloom.nbytes / 1024:10.1f} KB per process")
+    print(f"lookup  python set:     {lookups(python_set) * 1e9:10.0f} ns")
+    print(f"        mapped exact:   {lookups(exact) * 1e9:10.0f} ns")
+    print(f"        bloom:          {lookups(bloom) * 1e9:10.0f} ns")
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Measures what SnarkyMetrics costs get_response, disabled and enabled.
+
+    python -m benchmarks.metrics [--size 5000] [--repeat 5] [--no-cache] [--show]
+
+Replays the same items through a SnarkyAI without metrics and one with them,
+both seeded alike, checks the replies are identical and prints the time per
+request of each. --no-cache runs every check on every request, which is what
+the per-check timings measure. --show prints the collected metrics in the
+Prometheus text format.
+"""
+import argparse
+import sys
+import timeit
+
+from SnarkyAI import SnarkyAI
+from benchmarks.batch import build_items
+from response_cache import ResponseCache
+from snarky_metrics import SnarkyMetrics
+
+
+def run(items, metrics=None, cache=True):
+    ai = SnarkyAI(seed=0, metrics=metrics,
+                  response_cache=None if cache else ResponseCache(max_entries=0))
+    return [
+        ai.get_response(item) if isinstance(item, str) else ai.get_response(item[1], session_id=item[0])
+        for item in items
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the metrics hooks.")
+    parser.add_argument("--size", type=int, default=5000, help="number of items")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per variant")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--show", action="store_true", help="print the collected metrics")
+    args = parser.parse_args(argv)
+
+    items = build_items(args.size, sessions=50)
+    cache = not args.no_cache
+    metrics = SnarkyMetrics()
+
+    mismatches = sum(a != b for a, b in zip(run(items, cache=cache), run(items, metrics, cache)))
+
+    plain = min(timeit.repeat(lambda: run(items, cache=cache), number=1, repeat=args.repeat))
+    timed = min(timeit.repeat(lambda: run(items, SnarkyMetrics(), cache), number=1, repeat=args.repeat))
+
+    per_item = 1e6 / len(items)
+    print(f"{len(items)} requests, response cache {'on' if cache else 'off'}")
+    print(f"  without metrics: {plain * per_item:7.2f} us/request")
+    print(f"  with metrics:    {timed * per_item:7.2f} us/request  ({timed / plain - 1:+.1%})")
+    print(f"  mismatched replies: {mismatches}")
+    if args.show:
+        print(metrics.render_prometheus(), end="")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Times the misspelling check as the correction dictionary grows.
+
+    python -m benchmarks.misspellings [--sizes 21,1000,10000,50000] [--inputs 100]
+
+For each size a tab-separated dictionary of made-up misspellings is written
+next to a copy of snarky_responses.json and loaded through "misspelling_files".
+The token lookup in SnarkyAI._check_misspellings is timed against the old
+linear scan (one precompiled \\bword\\b regex per entry, first hit wins) and
+both must pick the same correction for every input.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import string
+import sys
+import tempfile
+import timeit
+
+from SnarkyAI import SnarkyAI
+from benchmarks.keywords import build_corpus
+from snarky_registry import DEFAULT_PATH, load_registry
+from text_analysis import TextAnalysis
+
+
+def fake_words(count, seed=0):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def build_registry(directory, size):
+    with open(DEFAULT_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    extra = max(size - len(data["misspellings"]), 0)
+    with open(os.path.join(directory, "extra.tsv"), "w", encoding="utf-8") as f:
+        for word in fake_words(extra):
+            f.write(f"{word}\tIt's spelled '{word[::-1]}'.\n")
+    data["misspelling_files"] = ["extra.tsv"]
+    path = os.path.join(directory, "responses.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return load_registry(path)
+
+
+def linear_scan(patterns, text):
+    for pattern, response in patterns:
+        if pattern.search(text):
+            return response
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the misspelling lookup.")
+    parser.add_argument("--sizes", default="21,1000,10000,50000", help="comma-separated dictionary sizes")
+    parser.add_argument("--inputs", type=int, default=100, help="number of inputs per size")
+    args = parser.parse_args(argv)
+
+    corpus = [text.lower() for text in build_corpus(args.inputs)]
+    mismatches = 0
+    for size in (int(size) for size in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            registry = build_registry(directory, size)
+        ai = SnarkyAI(registry=registry)
+
+        # Sprinkle some dictionary words into the inputs so both paths find hits.
+        rng = random.Random(size)
+        words = list(registry.misspellings)
+        texts = [f"{text} {rng.choice(words)}" if rng.random() < 0.5 else text for text in corpus]
+        analyses = [TextAnalysis(text) for text in texts]
+        patterns = [
+            (re.compile(r"\b" + re.escape(word) + r"\b"), response)
+            for word, (_, response) in registry.misspellings.items()
+        ]
+
+        insults = registry.misspelling_insults
+        for text, analysis in zip(texts, analyses):
+            expected = linear_scan(patterns, text)
+            expected = tuple(insult + expected for insult in insults) if expected else None
+            if ai._check_misspellings(analysis) != expected:
+                mismatches += 1
+                print(f"MISMATCH size={size} {text!r}")
+
+        scan = min(timeit.repeat(lambda: [linear_scan(patterns, t) for t in texts], number=1, repeat=3))
+        table = min(timeit.repeat(lambda: [ai._check_misspellings(a) for a in analyses], number=1, repeat=3))
+        print(f"{len(registry.misspellings):>7} entries:  linear {scan / len(texts) * 1e6:10.2f} us/input"
+              f"   table {table / len(texts) * 1e6:8.2f} us/input")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Replays a corpus through the original SnarkyAI logic and the current engine.
+
+    python -m benchmarks.reference [--size 5000] [--sessions 50] [--seed 7]
+
+ReferenceSnarkyAI is get_response as originally written: an unbounded
+repeat_count dict, a regex per misspelling and per topic, a findall for the
+nonsense check, and every random pick made inside the check that found it.
+It reads its reply pools from the registry (the same text the literals held)
+and takes the generator to pick with, so both engines can be driven from
+identically seeded random.Random instances.
+
+The corpus is replayed twice through the current engine (to show a seeded run
+reproduces itself, cache counters included) and once through the reference,
+one ReferenceSnarkyAI per session. Every reply must match output-for-output
+as long as no session sees more distinct inputs than RepeatTracker keeps.
+"""
+import argparse
+import random
+import re
+import sys
+from collections import deque
+
+import lexicon
+from SnarkyAI import SnarkyAI
+from benchmarks.batch import build_items
+from benchmarks.keywords import build_legacy_patterns
+from manual_sanitation import sanitize_expressive_fort_knox
+from snarky_registry import default_registry
+
+
+class ReferenceSnarkyAI:
+    """The original single-conversation engine, with an injectable generator."""
+    def __init__(self, rng, registry=None, words=None):
+        self.rng = rng
+        self.registry = registry or default_registry()
+        self.words = words if words is not None else lexicon.common_words()
+        self.topics = build_legacy_patterns()
+        self.question_history = deque(maxlen=10)
+        self.repeat_count = {}
+
+    def get_response(self, user_input):
+        if len(user_input) > 300:
+            return (
+                "WHOA! That's too long! I capped your input at 300 characters "
+                "because I'm not reading your novel, Tolstoy."
+                )
+        raw_input = sanitize_expressive_fort_knox(user_input, max_len=300)
+        if not raw_input:
+            return "You typed nothing. Is that a metaphor for the usefulness of your mind?"
+        normalized_input = raw_input.lower()
+
+        if len(raw_input) > 150:
+            return self.rng.choice(self.registry.long_question)
+
+        is_recent_repeat = normalized_input in self.question_history
+        self.repeat_count[normalized_input] = self.repeat_count.get(normalized_input, 0) + 1
+        count = self.repeat_count[normalized_input]
+        if is_recent_repeat or count > 1:
+            if count == 2:
+                return self.rng.choice(self.registry.repeat_twice)
+            if count == 3:
+                return self.rng.choice(self.registry.repeat_thrice)
+            return self.rng.choice(self.registry.repeat_more)
+        self.question_history.append(normalized_input)
+
+        response_pool = []
+        for func, arg in (
+            (self._check_grammar_and_style, raw_input),
+            (self._check_misspellings, normalized_input),
+            (self._check_nonsense, normalized_input),
+        ):
+            result = func(arg)
+            if result:
+                response_pool.append(result)
+        response_pool.extend(self._check_keywords(normalized_input))
+
+        if response_pool:
+            return self.rng.choice(response_pool)
+        return self.rng.choice(self.registry.default_responses)
+
+    def _check_nonsense(self, text):
+        words = re.findall(r'\b[a-z]{3,}\b', text)
+        if not words:
+            return None
+        non_common_words = sum(word not in self.words for word in words)
+        if non_common_words / len(words) > 0.05:
+            return self.rng.choice(self.registry.nonsense)
+        return None
+
+    def _check_misspellings(self, text):
+        for word, (_, response) in self.registry.misspellings.items():
+            if re.search(r"\b" + re.escape(word) + r"\b", text):
+                return self.rng.choice(self.registry.misspelling_insults) + response
+        return None
+
+    def _check_grammar_and_style(self, text):
+        registry = self.registry
+        if len(text) > 5 and not re.search(r'[?!.]$', text.strip()):
+            return self.rng.choice(registry.not_a_question)
+        if text.isupper() and len(text) > 5:
+            return self.rng.choice(registry.yelling)
+        if re.search(r'[a-z]', text) and not re.search(r'[A-Z]', text):
+            return self.rng.choice(registry.no_caps)
+        if '???' in text or '!!!' in text or '?!' in text:
+            return self.rng.choice(registry.punctuation)
+        if re.search(r'\byour\s+(wrong|stupid|dumb|bad|lame|the worst)\b', text, re.IGNORECASE):
+            return "I think you meant YOU'RE. As in 'you're an enormous idiot.'"
+        if re.search(r'\btheir\s+(going|coming|is|was|are)\b', text, re.IGNORECASE):
+            return "THEY'RE. T-H-E-Y-'-R-E. It's a contraction! Did you learn nothing from elementary school?"
+        return None
+
+    def _check_keywords(self, text):
+        found = {name for name, _, test in self.topics if test(text)}
+        return [
+            response for name, responses in self.registry.topic_responses if name in found
+            for response in responses
+        ]
+
+
+def replay_current(items, seed):
+    ai = SnarkyAI(seed=seed)
+    replies = [ai.get_response(question, session_id=session) for session, question in items]
+    return replies, ai.response_cache.stats()
+
+
+def replay_reference(items, seed):
+    rng = random.Random(seed)
+    engines = {}
+    replies = []
+    for session, question in items:
+        engine = engines.get(session)
+        if engine is None:
+            engine = engines[session] = ReferenceSnarkyAI(rng)
+        replies.append(engine.get_response(question))
+    return replies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff the current engine against the original logic.")
+    parser.add_argument("--size", type=int, default=5000, help="number of requests")
+    parser.add_argument("--sessions", type=int, default=50, help="number of distinct sessions")
+    parser.add_argument("--seed", type=int, default=7, help="seed for both engines")
+    args = parser.parse_args(argv)
+
+    # Every item carries a session, so each maps onto one reference conversation.
+    # Keep sessions under RepeatTracker's 256 distinct inputs: past that the
+    # current engine forgets old inputs on purpose and the reference never does.
+    items = [
+        item if not isinstance(item, str) else (f"session-{i % args.sessions}", item)
+        for i, item in enumerate(build_items(args.size, args.sessions))
+    ]
+
+    first, first_stats = replay_current(items, args.seed)
+    second, second_stats = replay_current(items, args.seed)
+    reference = replay_reference(items, args.seed)
+
+    unstable = sum(a != b for a, b in zip(first, second)) + (first_stats != second_stats)
+    mismatches = [i for i, (a, b) in enumerate(zip(first, reference)) if a != b]
+    for i in mismatches[:10]:
+        print(f"MISMATCH {items[i]!r}:\n  reference={reference[i]!r}\n  current=  {first[i]!r}")
+
+    print(f"requests:   {len(items)}")
+    print(f"reruns:     {unstable} differences (cache: {first_stats['hits']} hits, "
+          f"{first_stats['misses']} misses)")
+    print(f"reference:  {len(mismatches)} mismatches")
+    return 1 if unstable or mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Times early_exit reply selection against the default mode.
+
+    python -m benchmarks.sampling [--size 5000] [--repeat 11]
+
+Three measurements, each taking turns between the modes so a busy machine
+slows both alike, and reporting the best run of each plus the median of the
+per-run ratios:
+
+    select          _select alone on every distinct input's cached candidates,
+                    the only work a response cache hit does past the lookup
+    collect+select  _collect_candidates plus _select, a cache miss
+    get_response    the corpus replayed through get_response, cache on and off
+
+That both modes pick replies with the same distribution is checked by
+tests/test_early_exit.py.
+"""
+import argparse
+import random
+import statistics
+import sys
+import timeit
+
+from SnarkyAI import SnarkyAI
+from benchmarks.corpora import realistic
+from response_cache import ResponseCache
+
+
+def select_run(inputs, early_exit):
+    ai = SnarkyAI(early_exit=early_exit)
+    rng = random.Random(0)
+    candidates = [c for c in (ai._collect_candidates(raw, raw.lower()) for raw in inputs) if c]
+
+    def run():
+        for c in candidates:
+            ai._select(c, rng)
+    return run, len(candidates)
+
+
+def miss_run(inputs, early_exit):
+    ai = SnarkyAI(early_exit=early_exit)
+    rng = random.Random(0)
+    pairs = [(raw, raw.lower()) for raw in inputs]
+
+    def run():
+        for raw, normalized in pairs:
+            candidates = ai._collect_candidates(raw, normalized)
+            if candidates:
+                ai._select(candidates, rng)
+    return run, len(pairs)
+
+
+def replay_run(inputs, early_exit, cache):
+    def run():
+        ai = SnarkyAI(seed=0, early_exit=early_exit,
+                      response_cache=None if cache else ResponseCache(max_entries=0))
+        for i, text in enumerate(inputs):
+            ai.get_response(text, session_id=f"session-{i % 50}")
+    return run, len(inputs)
+
+
+def compare(build, repeat):
+    """Per-item seconds for (default, early_exit) over interleaved runs, plus the median ratio."""
+    runs = {mode: build(mode) for mode in (False, True)}
+    times = {False: [], True: []}
+    for i in range(repeat):
+        for mode in ((False, True) if i % 2 else (True, False)):
+            run, count = runs[mode]
+            times[mode].append(timeit.timeit(run, number=1) / count)
+    ratio = statistics.median(early / default for default, early in zip(times[False], times[True]))
+    return min(times[False]), min(times[True]), ratio - 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time early_exit reply selection.")
+    parser.add_argument("--size", type=int, default=5000, help="corpus size")
+    parser.add_argument("--repeat", type=int, default=11, help="timing runs per mode")
+    args = parser.parse_args(argv)
+
+    corpus = realistic(args.size)
+    distinct = sorted(set(corpus))
+    variants = (
+        ("select", lambda mode: select_run(distinct, mode)),
+        ("collect+select", lambda mode: miss_run(distinct, mode)),
+        ("get_response, cache on", lambda mode: replay_run(corpus, mode, True)),
+        ("get_response, cache off", lambda mode: replay_run(corpus, mode, False)),
+    )
+    for name, build in variants:
+        default, early, change = compare(build, args.repeat)
+        print(f"{name:<24} default {default * 1e9:9.0f} ns  early_exit {early * 1e9:9.0f} ns  "
+              f"(median {change:+.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Memory per session and observe() speed: SessionState against CompactSession.
+
+    python -m benchmarks.sessions [--sessions 100000] [--inputs 8] [--repeats 4]
+
+Fills a MemorySessionStore with --sessions conversations of each kind, every
+one having seen --inputs distinct questions (--repeats of them asked again),
+and reports the bytes allocated per session according to tracemalloc, both
+for the session objects alone and including the store's own bookkeeping
+(session id string, OrderedDict slot, timestamp). The questions themselves are
+shared by every session, as interned request strings would be, so a
+SessionState is not charged for their text, only for its references to them.
+
+It then replays the same observe() sequence through one session of each kind
+and checks both return the same repeat counts, and times observe() (see
+CompactSession for the trade-off these numbers show).
+"""
+import argparse
+import gc
+import random
+import sys
+import timeit
+import tracemalloc
+
+from benchmarks.keywords import build_corpus
+from session_store import CompactSession, MemorySessionStore, SessionState
+
+
+def session_inputs(questions, inputs, repeats, rng):
+    """One conversation's normalized inputs: inputs distinct, repeats asked twice."""
+    asked = rng.sample(questions, inputs)
+    return asked + asked[:repeats]
+
+
+def measure(factory, sessions, questions, inputs, repeats):
+    """Returns (bytes per session object, bytes per session including the store)."""
+    rng = random.Random(0)
+    plans = [session_inputs(questions, inputs, repeats, rng) for _ in range(sessions)]
+    ids = [f"session-{n}" for n in range(sessions)]
+
+    gc.collect()
+    tracemalloc.start()
+    store = MemorySessionStore(max_sessions=sessions, ttl=None, session_factory=factory)
+    before = tracemalloc.get_traced_memory()[0]
+    states = []
+    for session_id, plan in zip(ids, plans):
+        state = store.load(session_id)
+        for text in plan:
+            state.observe(text)
+        store.save(session_id, state)
+        states.append(state)
+    with_store = tracemalloc.get_traced_memory()[0] - before
+
+    # Same objects measured again without the store: drop it and what it made.
+    del store
+    gc.collect()
+    objects_only = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # states itself (a list of pointers) is charged to neither figure's session.
+    objects_only -= sys.getsizeof(states)
+    with_store -= sys.getsizeof(states)
+    return objects_only / sessions, with_store / sessions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark session memory.")
+    parser.add_argument("--sessions", type=int, default=100000, help="number of sessions")
+    parser.add_argument("--inputs", type=int, default=8, help="distinct questions per session")
+    parser.add_argument("--repeats", type=int, default=4, help="questions asked a second time")
+    args = parser.parse_args(argv)
+
+    questions = [text.lower() for text in build_corpus(1000, seed=0)]
+
+    print(f"{args.sessions} sessions, {args.inputs} distinct inputs each, {args.repeats} repeated")
+    for factory in (SessionState, CompactSession):
+        objects, total = measure(factory, args.sessions, questions, args.inputs, args.repeats)
+        print(f"  {factory.__name__:<15} {objects:8.0f} bytes/session  {total:8.0f} with the store")
+
+    rng = random.Random(1)
+    sequence = [rng.choice(questions[:12]) for _ in range(20000)]
+    full, compact = SessionState(), CompactSession()
+    mismatches = sum(min(full.observe(text), 255) != compact.observe(text) for text in sequence)
+    print(f"  repeat counts differing over {len(sequence)} observes: {mismatches}")
+
+    for factory in (SessionState, CompactSession):
+        state = factory()
+        seconds = min(timeit.repeat(lambda: [state.observe(text) for text in sequence],
+                                    number=1, repeat=5))
+        print(f"  {factory.__name__:<15} observe: {seconds / len(sequence) * 1e9:6.0f} ns")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+Reproducible benchmark suite for the SnarkyAI engine, with a regression gate.
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --baseline before.json [--tolerance 0.2]
+
+Every target runs over every corpus in benchmarks/corpora.py (seeded, so runs
+are comparable) for --rounds passes, each call timed on its own. Every input
+keeps its fastest time over the passes, giving latency percentiles per
+(target, corpus); throughput comes from the fastest pass:
+
+    get_response         fresh seeded SnarkyAI, response cache disabled
+    get_response_cached  the same with the default response cache
+    sanitize             sanitize_expressive_fort_knox(text, max_len=300)
+    check_long_question  SnarkyAI._check_long_question
+    check_<name>         each _check_* over a prebuilt TextAnalysis
+                         (grammar_and_style, misspellings, nonsense, keywords)
+
+The per-call timer itself costs well under a microsecond; it is included in
+every figure, so compare runs with each other rather than with timeit output.
+A "process" entry holds the cold import time of SnarkyAI and the peak RSS
+after importing and after the first reply (which maps the lexicon), each the
+median of --import-runs fresh interpreters.
+
+--output saves the run as JSON. --baseline compares against a saved run and
+exits 1 if any gated metric (ops_per_s, p50_us, p99_us, import_s and the RSS
+figures) got worse by more than --tolerance; p99_us and RSS use twice the
+tolerance since they are the noisiest. Baselines only make sense on the same
+machine and Python: the run's environment is recorded under "meta" and a
+mismatch is warned about.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from SnarkyAI import SnarkyAI
+from benchmarks.corpora import CORPORA, build_corpora
+from manual_sanitation import sanitize_expressive_fort_knox
+from response_cache import ResponseCache
+from text_analysis import TextAnalysis
+
+CHALLENGES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHECKS = ("grammar_and_style", "misspellings", "nonsense", "keywords")
+
+# metric: (+1 if higher is better else -1, tolerance multiplier)
+GATES = {
+    "ops_per_s": (1, 1),
+    "p50_us": (-1, 1),
+    "p99_us": (-1, 2),
+    "import_s": (-1, 1),
+    "rss_import_kb": (-1, 2),
+    "rss_first_response_kb": (-1, 2),
+}
+
+PROCESS_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import SnarkyAI
+imported = time.perf_counter() - started
+scale = 1024 if sys.platform == "darwin" else 1  # ru_maxrss is bytes on macOS, KiB elsewhere
+rss_import = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+SnarkyAI.SnarkyAI().get_response("Hwat is tha fooniest anminal to look at?")
+rss_first = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+print(json.dumps({"import_s": imported, "rss_import_kb": rss_import, "rss_first_response_kb": rss_first}))
+"""
+
+
+# --- TARGETS ---
+# Each builder takes a corpus and returns (call, args_list): call(*args) is
+# timed once per args in args_list. Builders run again before every pass, so
+# stateful targets (the repeat check) start each pass fresh.
+
+def _get_response(inputs, cache):
+    ai = SnarkyAI(seed=0, response_cache=None if cache else ResponseCache(max_entries=0))
+    return ai.get_response, [(text, f"session-{i % 50}") for i, text in enumerate(inputs)]
+
+
+def _sanitized(inputs):
+    """The inputs that make it past the cap and sanitizer, as the checks see them."""
+    out = []
+    for text in inputs:
+        if len(text) <= 300:
+            raw = sanitize_expressive_fort_knox(text, max_len=300)
+            if raw:
+                out.append(raw)
+    return out
+
+
+def _check(name):
+    def build(inputs):
+        ai = SnarkyAI(seed=0)
+        analyses = [(TextAnalysis(raw, raw.lower()),) for raw in _sanitized(inputs)]
+        return getattr(ai, f"_check_{name}"), analyses
+    return build
+
+
+def _check_long_question(inputs):
+    ai = SnarkyAI(seed=0)
+    rng = random.Random(0)
+    return ai._check_long_question, [(raw, rng) for raw in _sanitized(inputs)]
+
+
+TARGETS = {
+    "get_response": lambda inputs: _get_response(inputs, cache=False),
+    "get_response_cached": lambda inputs: _get_response(inputs, cache=True),
+    "sanitize": lambda inputs: (sanitize_expressive_fort_knox, [(text, 300) for text in inputs]),
+    "check_long_question": _check_long_question,
+    **{f"check_{name}": _check(name) for name in CHECKS},
+}
+
+
+# --- MEASUREMENT ---
+
+def time_calls(build, inputs, rounds):
+    """Times every call separately in each of rounds passes; returns the summary dict.
+
+    Each input keeps its fastest time over the rounds and throughput comes from
+    the fastest pass, which filters out most scheduler and GC noise.
+    """
+    clock = time.perf_counter_ns
+    call, args_list = build(inputs[:100])
+    for args in args_list:
+        call(*args)  # warm-up: lazy lexicon loads, first regex use
+
+    best = None
+    fastest_pass = None
+    for _ in range(rounds):
+        call, args_list = build(inputs)
+        samples = []
+        started = clock()
+        for args in args_list:
+            t0 = clock()
+            call(*args)
+            samples.append(clock() - t0)
+        elapsed = clock() - started
+        best = samples if best is None else list(map(min, best, samples))
+        fastest_pass = elapsed if fastest_pass is None else min(fastest_pass, elapsed)
+    return summarize(best or [], fastest_pass)
+
+
+def summarize(samples_ns, elapsed_ns):
+    if not samples_ns:
+        return {"calls": 0}
+    samples_ns = sorted(samples_ns)
+    n = len(samples_ns)
+
+    def percentile(q):
+        return samples_ns[min(n - 1, int(q * n))] / 1000
+
+    return {
+        "calls": n,
+        "ops_per_s": n / (elapsed_ns / 1e9),
+        "mean_us": sum(samples_ns) / n / 1000,
+        "p50_us": percentile(0.50),
+        "p90_us": percentile(0.90),
+        "p99_us": percentile(0.99),
+        "max_us": samples_ns[-1] / 1000,
+    }
+
+
+def measure_process(runs):
+    """Import time and peak RSS from fresh interpreters; medians over runs."""
+    probes = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROCESS_PROBE], cwd=CHALLENGES_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+        probes.append(json.loads(out))
+    return {key: statistics.median(probe[key] for probe in probes) for key in probes[0]}
+
+
+def run_suite(size=2000, seed=0, rounds=5, corpora=None, targets=None, import_runs=5):
+    corpora = build_corpora(size, seed, corpora)
+    results = {}
+    for target in targets or TARGETS:
+        for corpus_name, inputs in corpora.items():
+            results[f"{target}/{corpus_name}"] = time_calls(TARGETS[target], inputs, rounds)
+    if import_runs:
+        results["process"] = measure_process(import_runs)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "size": size,
+            "seed": seed,
+            "rounds": rounds,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+# --- COMPARISON ---
+
+def compare(current, baseline, tolerance):
+    """Returns (name, metric, before, after, change, regressed) for every shared gated metric."""
+    rows = []
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            continue
+        for metric, (direction, scale) in GATES.items():
+            if metric not in before or metric not in after or not before[metric]:
+                continue
+            change = after[metric] / before[metric] - 1
+            regressed = -direction * change > tolerance * scale
+            rows.append((name, metric, before[metric], after[metric], change, regressed))
+    return rows
+
+
+def environment_mismatch(current, baseline):
+    keys = ("python", "implementation", "machine", "size", "seed", "rounds")
+    return [key for key in keys if current["meta"].get(key) != baseline["meta"].get(key)]
+
+
+def print_results(run):
+    print(f"{'target/corpus':<38}{'calls':>8}{'ops/s':>12}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}")
+    for name, row in run["results"].items():
+        if name == "process":
+            continue
+        if not row["calls"]:
+            print(f"{name:<38}{0:>8}")
+            continue
+        print(f"{name:<38}{row['calls']:>8}{row['ops_per_s']:>12,.0f}"
+              f"{row['p50_us']:>10.2f}{row['p90_us']:>10.2f}{row['p99_us']:>10.2f}")
+    process = run["results"].get("process")
+    if process:
+        print(f"import SnarkyAI: {process['import_s'] * 1000:.1f} ms  "
+              f"RSS after import: {process['rss_import_kb'] / 1024:.1f} MiB  "
+              f"after first reply: {process['rss_first_response_kb'] / 1024:.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the SnarkyAI benchmark suite.")
+    parser.add_argument("--size", type=int, default=2000, help="inputs per corpus")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    parser.add_argument("--rounds", type=int, default=5, help="timed passes over each corpus")
+    parser.add_argument("--corpora", help=f"comma-separated subset of {','.join(CORPORA)}")
+    parser.add_argument("--targets", help=f"comma-separated subset of {','.join(TARGETS)}")
+    parser.add_argument("--import-runs", type=int, default=5,
+                        help="fresh interpreters for import time and RSS (0 skips)")
+    parser.add_argument("--output", metavar="PATH", help="save this run as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression before failing (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    corpora = args.corpora.split(",") if args.corpora else None
+    targets = args.targets.split(",") if args.targets else None
+    for name in corpora or ():
+        if name not in CORPORA:
+            parser.error(f"unknown corpus {name!r}")
+    for name in targets or ():
+        if name not in TARGETS:
+            parser.error(f"unknown target {name!r}")
+
+    run = run_suite(args.size, args.seed, args.rounds, corpora, targets, args.import_runs)
+    print_results(run)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+            f.write("\n")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    mismatched = environment_mismatch(run, baseline)
+    if mismatched:
+        print(f"warning: baseline differs in {', '.join(mismatched)}; comparison may be meaningless",
+              file=sys.stderr)
+
+    rows = compare(run, baseline, args.tolerance)
+    regressions = [row for row in rows if row[5]]
+    print(f"\n{len(rows)} metrics compared against {args.baseline}, {len(regressions)} regressed")
+    for name, metric, before, after, change, _ in regressions:
+        print(f"  REGRESSION {name} {metric}: {before:.4g} -> {after:.4g} ({change:+.1%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Hammers one shared SnarkyAI from many threads and checks the repeat counts.
+
+    python -m benchmarks.threads [--threads 16] [--sessions 40] [--per-session 400]
+                                 [--store memory|sqlite]
+
+Every session gets a known multiset of questions, shuffled and spread across
+all the threads so the same session is hit concurrently. Whatever order the
+requests land in, afterwards each (session, question) count in the store must
+equal the number of times it was sent, and each session must have had exactly
+one non-repeat reply per distinct question.
+
+Both modes run: thread_safe=True must come out exact, thread_safe=False shows
+what the races cost (lost updates are likeliest with --store sqlite, where a
+session is a JSON row read and rewritten per request). The thread switch
+interval is shortened to make interleavings frequent.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from SnarkyAI import SnarkyAI
+from benchmarks.keywords import build_corpus
+from manual_sanitation import sanitize_expressive_fort_knox
+from response_cache import ResponseCache
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def build_workload(sessions, per_session, seed=0):
+    """(session, question) items, shuffled, plus the expected count of each."""
+    rng = random.Random(seed)
+    # Short questions only: over 150 characters the repeat check never runs.
+    questions = [text for text in build_corpus(100, seed=seed) if len(text) <= 150]
+    items = []
+    for session in range(sessions):
+        # Few enough distinct questions that RepeatTracker never has to evict.
+        pool = rng.sample(questions, 30)
+        items += [(f"session-{session}", rng.choice(pool)) for _ in range(per_session)]
+    rng.shuffle(items)
+    return items, Counter(items)
+
+
+def hammer(ai, items, threads):
+    """Splits items round-robin over threads; returns (item, reply) pairs."""
+    results = [None] * len(items)
+    start = threading.Barrier(threads)
+
+    def work(offset):
+        start.wait()
+        for i in range(offset, len(items), threads):
+            session, question = items[i]
+            results[i] = ai.get_response(question, session_id=session)
+
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return list(zip(items, results))
+
+
+def check(ai, results, expected):
+    """Returns the number of wrong repeat counts and wrong non-repeat replies."""
+    registry = ai.registry
+    repeat_replies = set(registry.repeat_twice + registry.repeat_thrice + registry.repeat_more)
+    fresh = Counter()
+    for (session, question), reply in results:
+        if reply not in repeat_replies:
+            fresh[session, question] += 1
+
+    wrong_counts = 0
+    for (session, question), count in expected.items():
+        state = ai.session_store.load(session)
+        normalized = sanitize_expressive_fort_knox(question, max_len=300).lower()
+        if state.repeat_count.get(normalized, 0) != count:
+            wrong_counts += 1
+    wrong_fresh = sum(fresh[key] != 1 for key in expected)
+    return wrong_counts, wrong_fresh
+
+
+def make_store(kind):
+    return SQLiteSessionStore() if kind == "sqlite" else MemorySessionStore()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress a shared SnarkyAI from many threads.")
+    parser.add_argument("--threads", type=int, default=16, help="number of threads")
+    parser.add_argument("--sessions", type=int, default=40, help="number of sessions")
+    parser.add_argument("--per-session", type=int, default=400, help="requests per session")
+    parser.add_argument("--store", choices=("memory", "sqlite"), default="memory", help="session store")
+    args = parser.parse_args(argv)
+
+    items, expected = build_workload(args.sessions, args.per_session)
+    sys.setswitchinterval(1e-6)
+
+    failed = False
+    for thread_safe in (True, False):
+        ai = SnarkyAI(session_store=make_store(args.store), response_cache=ResponseCache(),
+                      thread_safe=thread_safe)
+        started = time.perf_counter()
+        results = hammer(ai, items, args.threads)
+        elapsed = time.perf_counter() - started
+        wrong_counts, wrong_fresh = check(ai, results, expected)
+
+        print(f"thread_safe={thread_safe!s:<5}  {len(items)} requests in {elapsed:6.2f}s  "
+              f"wrong counts: {wrong_counts}/{len(expected)}  "
+              f"wrong first replies: {wrong_fresh}/{len(expected)}")
+        if thread_safe and (wrong_counts or wrong_fresh):
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Single-pass topic matcher for SnarkyAI's keyword check.
+
+Topics are declared as (name, kind, terms):
+
+    ("pets", "words", ("dog", "cat", "pet")) # like re.search(r'\b(dog|cat|pet)\b')
+    ("identity", "contains", ("what are you",))  # like 'what are you' in text
+    ("how", "prefix", ("how",))              # like text.startswith('how')
+    ("math", "regex", (r'\d+\s*[+*/-]\s*\d+',))  # like re.search(pattern, text)
+
+Every "words" vocabulary is compiled into one trie over word tokens, so a
+single scan over the text finds every matching topic at once instead of
+running one word-boundary regex per topic. Multi-word terms ("video game",
+"tell me about") match only when their words are separated by exactly one
+space, just as they would inside the regex.
+"""
+import re
+
+# Word tokens are maximal runs of \w, which is exactly what \b delimits.
+TOKEN_RE = re.compile(r"\w+")
+
+_END = object()
+
+
+class KeywordMatcher:
+    """Compiles topic vocabularies once and reports every topic in a text."""
+    KINDS = ("words", "contains", "prefix", "regex")
+
+    def __init__(self, topics):
+        self.topics = tuple(topics)
+        self._trie = {}
+        self._contains = []
+        self._prefixes = []
+        self._patterns = []
+
+        for name, kind, terms in self.topics:
+            if kind not in self.KINDS:
+                raise ValueError(f"Unknown keyword kind {kind!r} for topic {name!r}")
+            for term in terms:
+                if kind == "words":
+                    self._add_words(name, term)
+                elif kind == "contains":
+                    self._contains.append((term, name))
+                elif kind == "prefix":
+                    self._prefixes.append((term, name))
+                else:
+                    self._patterns.append((re.compile(term), name))
+
+        # startswith() takes a tuple, so one call covers every prefix topic.
+        self._prefix_tuple = tuple(prefix for prefix, _ in self._prefixes)
+
+    def match(self, text, tokens=None):
+        """
+        Returns the set of topic names found in text.
+        Pass tokens (a list of TOKEN_RE matches over text) to reuse a scan.
+        """
+        found = set()
+        if tokens is None:
+            tokens = list(TOKEN_RE.finditer(text))
+
+        trie = self._trie
+        count = len(tokens)
+        for i, token in enumerate(tokens):
+            node = trie.get(token.group())
+            j = i
+            while node is not None:
+                names = node.get(_END)
+                if names:
+                    found.update(names)
+                j += 1
+                # Phrases continue only across a single literal space.
+                if j == count or text[tokens[j - 1].end():tokens[j].start()] != " ":
+                    break
+                node = node.get(tokens[j].group())
+
+        for term, name in self._contains:
+            if term in text:
+                found.add(name)
+
+        if self._prefix_tuple and text.startswith(self._prefix_tuple):
+            for prefix, name in self._prefixes:
+                if text.startswith(prefix):
+                    found.add(name)
+
+        for pattern, name in self._patterns:
+            if pattern.search(text):
+                found.add(name)
+
+        return found
+
+    def _add_words(self, name, term):
+        words = term.split(" ")
+        if not all(TOKEN_RE.fullmatch(word) for word in words):
+            raise ValueError(
+                f"Term {term!r} for topic {name!r} must be words separated by single spaces"
+            )
+        node = self._trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node.setdefault(_END, []).append(name)
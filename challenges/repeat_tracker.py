@@ -0,0 +1,141 @@
+"""
+Bounded, decaying replacement for SnarkyAI's old repeat_count dict.
+
+The dict gained a key for every distinct input and never shrank. RepeatTracker
+keeps the same counts for recent inputs but lives inside a memory budget:
+
+    counts = RepeatTracker(max_entries=256, max_bytes=64 * 1024, ttl=86400)
+    counts.increment("why?")   # -> 1, then 2, 3, ...
+    counts.stats()             # {'entries': 1, 'bytes': 131, 'evictions': 0, ...}
+
+Entries are kept in least-recently-seen order. Once max_entries or max_bytes
+is exceeded the stalest inputs are evicted, and with a ttl an input that has
+not been seen for ttl seconds decays back to a count of zero.
+"""
+import sys
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+# Rough per-entry cost on top of the key itself: the OrderedDict slot and
+# link node plus the [count, touched] list holding an int and a float.
+ENTRY_OVERHEAD = 200
+
+
+class RepeatTracker:
+    """Size-capped LRU of input -> repeat count with optional time decay."""
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=None, ttl=None, clock=time.time):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        count = self.get(key)
+        if count is None:
+            raise KeyError(key)
+        return count
+
+    def __setitem__(self, key, count):
+        entry = self._touch(key)
+        entry[0] = count
+        self._evict()
+
+    def get(self, key, default=None):
+        """Returns the key's count without refreshing it."""
+        entry = self._entries.get(key)
+        if entry is None or self._expired(entry[1], self.clock()):
+            return default
+        return entry[0]
+
+    def increment(self, key):
+        """Counts one more sighting of key and returns its new count."""
+        entry = self._touch(key)
+        entry[0] += 1
+        self._evict()
+        return entry[0]
+
+    def items(self):
+        """Yields (key, count) pairs, stalest first."""
+        now = self.clock()
+        for key, (count, touched) in self._entries.items():
+            if not self._expired(touched, now):
+                yield key, count
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def to_list(self):
+        """Serializes to [[key, count, touched], ...] in LRU order."""
+        return [[key, count, touched] for key, (count, touched) in self._entries.items()]
+
+    def load_list(self, rows):
+        """Restores entries written by to_list()."""
+        for key, count, touched in rows:
+            entry = self._touch(key)
+            entry[0] = count
+            entry[1] = touched
+        self._evict()
+
+    # --- HELPER METHODS ---
+
+    def _expired(self, touched, now):
+        return self.ttl is not None and now - touched > self.ttl
+
+    def _touch(self, key):
+        """Returns key's [count, touched] entry, moved to the fresh end."""
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry[1], now):
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            entry = self._entries[key] = [0, now]
+            self._bytes += sys.getsizeof(key) + ENTRY_OVERHEAD
+        else:
+            entry[1] = now
+            self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._bytes -= sys.getsizeof(key) + ENTRY_OVERHEAD
+
+    def _evict(self):
+        """Drops the stalest entries until back under budget; never the newest."""
+        now = self.clock()
+        while len(self._entries) > 1:
+            key, (_, touched) = next(iter(self._entries.items()))
+            if self._expired(touched, now):
+                self.expirations += 1
+            elif len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self.evictions += 1
+            else:
+                break
+            self._remove(key)
@@ -0,0 +1,156 @@
+"""
+Memoizes SnarkyAI's reply candidates per sanitized input.
+
+Everything get_response does before its final random pick depends only on the
+sanitized input, so popular questions asked again (by anyone) can skip every
+check and just re-sample from the cached candidates. Entries are
+(candidates, matches) pairs: matches names the checks and keyword topics that
+matched, so metrics can count them without rerunning the checks:
+
+    cache = ResponseCache(max_entries=4096, max_bytes=8 * 1024 * 1024, ttl=3600)
+    entry = cache.get(raw_input, MISSING)
+    if entry is MISSING:
+        entry = run_checks(raw_input)
+        cache.put(raw_input, entry)
+    candidates, matches = entry
+    cache.stats()   # {'entries': 1, 'bytes': 912, 'hits': 0, 'misses': 1, ...}
+
+The cache stores candidates, never chosen replies, so a hit still picks a fresh
+reply each time. Entries are kept least-recently-used first; once max_entries
+or max_bytes is exceeded the stalest go, and with a ttl an entry older than ttl
+seconds counts as a miss. A cache with max_entries=0 stores nothing.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by get() for a miss, since None is itself a cacheable result
+# (no check matched, so the reply comes from the default pool).
+MISSING = object()
+
+# Rough per-entry cost on top of the key and the cached entry: the OrderedDict slot
+# and link node plus the (stored, entry, size) tuple.
+ENTRY_OVERHEAD = 200
+
+
+class ResponseCache:
+    """Thread-safe LRU of sanitized input -> (candidates, matches) with TTL and a byte budget."""
+    def __init__(self, max_entries=4096, max_bytes=8 * 1024 * 1024, ttl=3600, clock=time.monotonic):
+        if max_entries < 0:
+            raise ValueError("max_entries must not be negative")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=MISSING):
+        """Returns the cached entry for key, refreshing it, or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0], self.clock()):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, entry):
+        """Caches a (candidates, matches) entry for key, evicting the stalest if over budget."""
+        if not self.max_entries:
+            return
+        size = sys.getsizeof(key) + _entry_size(entry) + ENTRY_OVERHEAD
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self.clock(), entry, size)
+            self._bytes += size
+            self._evict()
+
+    def clear(self):
+        """Drops every entry (e.g. after the registry it was built from changes)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    # --- HELPER METHODS ---
+
+    def _expired(self, stored, now):
+        return self.ttl is not None and now - stored > self.ttl
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        """Drops expired and over-budget entries, stalest first; never the newest."""
+        now = self.clock()
+        while len(self._entries) > 1:
+            key, (stored, _, _) = next(iter(self._entries.items()))
+            if self._expired(stored, now):
+                self.expirations += 1
+            elif len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self.evictions += 1
+            else:
+                break
+            self._remove(key)
+
+
+def _entry_size(entry):
+    """
+    Approximate bytes held by a (candidates, matches) entry. The names in
+    matches are the registry's own strings, so only their tuples are counted.
+    """
+    candidates, (hits, topics) = entry
+    return (sys.getsizeof(entry) + sys.getsizeof(entry[1]) + sys.getsizeof(hits)
+            + sys.getsizeof(topics) + _candidates_size(candidates))
+
+
+def _candidates_size(candidates):
+    """
+    Approximate bytes held by (picks, spread), or early_exit's (picks, pools,
+    size). Replies inside picks are counted even when the pool is the
+    registry's own (misspelling replies are built per input); keyword replies
+    and pools in spread always belong to the registry, so only their tuple is.
+    """
+    if candidates is None:
+        return 0
+    picks, spread = candidates[0], candidates[1]
+    size = sys.getsizeof(candidates) + sys.getsizeof(picks) + sys.getsizeof(spread)
+    for pick in picks:
+        size += sys.getsizeof(pick)
+        if not isinstance(pick, str):
+            size += sum(sys.getsizeof(reply) for reply in pick)
+    return size
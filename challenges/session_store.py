@@ -0,0 +1,391 @@
+"""
+Session state for SnarkyAI's repeat check, keyed by session id.
+
+A SessionState holds one conversation's question_history and repeat_count.
+Stores hand them out and take them back once per request:
+
+    store = MemorySessionStore(max_sessions=10000, ttl=3600)
+    state = store.load("abc")            # fresh state if unknown or expired
+    repeat = state.observe("why?")       # 0 the first time, 2, 3, ... after
+    store.save("abc", state)
+
+For very many concurrent sessions, CompactSession answers observe() the same
+way in a fraction of the memory: a short LRU of 64-bit entries, each a 56-bit
+input hash with an 8-bit repeat count, instead of strings in a deque, a dict
+and a RepeatTracker, at some cost in speed (see CompactSession). Stores build
+whichever kind session_factory names:
+
+    store = MemorySessionStore(max_sessions=500000, session_factory=CompactSession)
+
+session_options are passed to every session a store builds or restores. For
+SessionState they set its RepeatTracker's budget (see repeat_tracker.py):
+
+    store = MemorySessionStore(session_options={"max_entries": 64, "ttl": 86400})
+    store.stats()   # {'sessions': 1, 'repeat_entries': 3, 'repeat_bytes': 612, ...}
+
+MemorySessionStore keeps live objects in an in-process LRU with TTL eviction.
+SQLiteSessionStore keeps them as JSON rows, so a local file can hold sessions
+across restarts or be shared by several worker processes.
+
+Stores are safe to call from several threads, but a SessionState is not, and
+load -> observe -> save is a read-modify-write. Code sharing a store between
+threads holds the session's SessionLocks stripe around the whole sequence.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+from repeat_tracker import DEFAULT_MAX_ENTRIES, RepeatTracker
+
+HISTORY_SIZE = 10
+
+# Seconds a session may sit idle before a store forgets it.
+DEFAULT_TTL = 3600
+
+# SQLiteSessionStore deletes expired rows once every this many saves.
+PURGE_EVERY = 1000
+
+
+class SessionState:
+    """Repeat-check memory for one conversation."""
+    def __init__(self, history=(), repeat_count=None, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=None, ttl=None):
+        # Deque memory increased to 10 for more robust history tracking.
+        self.question_history = deque(history, maxlen=HISTORY_SIZE)
+        if repeat_count is None:
+            repeat_count = RepeatTracker(max_entries, max_bytes, ttl)
+        self.repeat_count = repeat_count
+
+    def observe(self, normalized_input):
+        """
+        Records one normalized input.
+        Returns its repeat count (2, 3, ...) if it's a repeat, or 0 if it's new.
+        """
+        is_recent_repeat = normalized_input in self.question_history
+        count = self.repeat_count.increment(normalized_input)
+        if is_recent_repeat and count < 2:
+            # The tracker evicted or expired an input the history still holds;
+            # asking it again is still at least the second time.
+            count = self.repeat_count[normalized_input] = 2
+
+        if is_recent_repeat or count > 1:
+            return count
+
+        self.question_history.append(normalized_input)
+        return 0
+
+    def stats(self):
+        return self.repeat_count.stats()
+
+    def to_dict(self):
+        return {"history": list(self.question_history), "repeat_count": self.repeat_count.to_list()}
+
+    @classmethod
+    def from_dict(cls, data, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=None, ttl=None):
+        repeat_count = RepeatTracker(max_entries, max_bytes, ttl)
+        rows = data.get("repeat_count") or []
+        if isinstance(rows, dict):
+            # Rows written before repeat counts were bounded.
+            for key, count in rows.items():
+                repeat_count[key] = count
+        else:
+            repeat_count.load_list(rows)
+        return cls(data.get("history", ()), repeat_count)
+
+
+# CompactSession entries are 8 bytes: a 7-byte (56-bit) hash of the input
+# followed by a 1-byte repeat count.
+HASH_BYTES = 7
+ENTRY_BYTES = HASH_BYTES + 1
+MAX_COUNT = 255
+COMPACT_ENTRIES = 16
+
+
+def input_hash(normalized_input):
+    """Stable 56-bit hash of an input, as bytes."""
+    return hashlib.blake2b(normalized_input.encode("utf-8"), digest_size=HASH_BYTES).digest()
+
+
+class CompactSession:
+    """
+    SessionState's repeat check in one bytearray: the last max_entries distinct
+    inputs, least recently seen first, as 64-bit hash + count entries. Unlike
+    SessionState it remembers counts for max_entries inputs rather than
+    RepeatTracker's 256, counts stop at 255, and inputs are never stored, only
+    their hashes (two inputs colliding in 56 bits would count as one).
+
+    The trade-off, measured by benchmarks/sessions.py: about 170 bytes per
+    session against SessionState's 2.5 KB (8 inputs each), but observe() takes
+    about 1.3 us against 1.0 us, a third slower, since every input is hashed and
+    the bytearray shifted. Use it when session memory, not per-request time, is
+    what runs out.
+    """
+    __slots__ = ("_entries",)
+    max_entries = COMPACT_ENTRIES
+
+    def __init__(self, entries=b""):
+        self._entries = bytearray(entries)
+
+    def __len__(self):
+        return len(self._entries) // ENTRY_BYTES
+
+    def observe(self, normalized_input):
+        """
+        Records one normalized input.
+        Returns its repeat count (2, 3, ...) if it's a repeat, or 0 if it's new.
+        """
+        key = input_hash(normalized_input)
+        entries = self._entries
+        offset = self._find(key)
+        if offset >= 0:
+            count = min(entries[offset + HASH_BYTES] + 1, MAX_COUNT)
+            del entries[offset:offset + ENTRY_BYTES]
+            entries += key
+            entries.append(count)
+            return count
+
+        if len(entries) >= self.max_entries * ENTRY_BYTES:
+            del entries[:ENTRY_BYTES]
+        entries += key
+        entries.append(1)
+        return 0
+
+    def count(self, normalized_input):
+        """How many times the input has been seen while remembered (0 if not)."""
+        offset = self._find(input_hash(normalized_input))
+        return self._entries[offset + HASH_BYTES] if offset >= 0 else 0
+
+    def stats(self):
+        return {
+            "entries": len(self),
+            "bytes": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+    def to_dict(self):
+        return {"entries": self._entries.hex()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(bytes.fromhex(data.get("entries") or ""))
+
+    def _find(self, key):
+        """Offset of key's entry, or -1. Matches straddling two entries are skipped."""
+        entries = self._entries
+        offset = entries.find(key)
+        while offset >= 0 and offset % ENTRY_BYTES:
+            offset = entries.find(key, offset + 1)
+        return offset
+
+
+class SessionLocks:
+    """
+    Striped locks serializing each session's load -> observe -> save.
+    Sessions hash onto a fixed pool of locks, so memory stays constant however
+    many sessions there are; two sessions sharing a stripe just take turns.
+    """
+    def __init__(self, stripes=64):
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+
+    def lock_for(self, session_id):
+        return self._locks[hash(session_id) % len(self._locks)]
+
+
+class SessionStore:
+    """Interface for session backends."""
+    session_factory = SessionState
+    session_options = None
+
+    def new_session(self):
+        """A fresh state of the kind this store holds."""
+        return self.session_factory(**(self.session_options or {}))
+
+    def load(self, session_id):
+        """Returns the session's SessionState, or a fresh one."""
+        raise NotImplementedError
+
+    def save(self, session_id, state):
+        """Stores the session's SessionState after a request."""
+        raise NotImplementedError
+
+    def discard(self, session_id):
+        """Forgets a session."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Session count and whatever else the backend can report cheaply."""
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU of live SessionState objects with TTL eviction."""
+    def __init__(self, max_sessions=10000, ttl=DEFAULT_TTL, clock=time.monotonic,
+                 session_factory=SessionState, session_options=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self.session_factory = session_factory
+        self.session_options = session_options
+        self.evictions = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def load(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or self._expired(entry[0]):
+                return self.new_session()
+            return entry[1]
+
+    def save(self, session_id, state):
+        with self._lock:
+            self._sessions[session_id] = (self.clock(), state)
+            self._sessions.move_to_end(session_id)
+            self._evict()
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        """Session counts plus every live session's repeat tracker stats, summed."""
+        with self._lock:
+            states = [state for _, state in self._sessions.values()]
+            stats = {"sessions": len(states), "max_sessions": self.max_sessions,
+                     "evictions": self.evictions}
+        totals = dict.fromkeys(("entries", "bytes", "evictions", "expirations"), 0)
+        for state in states:
+            for key, value in state.stats().items():
+                if key in totals:
+                    totals[key] += value
+        stats.update((f"repeat_{key}", value) for key, value in totals.items())
+        return stats
+
+    def _expired(self, touched):
+        return self.ttl is not None and self.clock() - touched > self.ttl
+
+    def _evict(self):
+        """Drops expired sessions and anything over max_sessions, oldest first."""
+        # Saves move sessions to the end, so the stalest ones are always in front.
+        while self._sessions:
+            touched, _ = next(iter(self._sessions.values()))
+            if len(self._sessions) <= self.max_sessions and not self._expired(touched):
+                break
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SessionState rows in a SQLite database (a file path or ':memory:').
+
+    With a ttl, every purge_every-th save also deletes the expired rows, so a
+    long-running server's file stays bounded by its active sessions; without
+    one, rows stay until discarded.
+
+    Each session is one JSON row, so every load and save decodes and encodes
+    the whole state: the history plus every RepeatTracker entry. The cost per
+    request grows with the tracker budget. Measured for a load, observe and
+    save on one machine: about 80 us with 10 entries, 300 us with 64 and 1 ms
+    at the default 256. Servers on this store should keep --repeat-entries
+    small.
+    """
+    def __init__(self, path=":memory:", ttl=None, clock=time.time, session_factory=SessionState,
+                 session_options=None, purge_every=PURGE_EVERY):
+        self.ttl = ttl
+        self.clock = clock
+        self.session_factory = session_factory
+        self.session_options = session_options
+        self.purge_every = purge_every
+        self._saves = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, state TEXT NOT NULL, touched REAL NOT NULL)"
+        )
+
+    def load(self, session_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state, touched FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None or (self.ttl is not None and self.clock() - row[1] > self.ttl):
+            return self.new_session()
+        return self.session_factory.from_dict(json.loads(row[0]), **(self.session_options or {}))
+
+    def save(self, session_id, state):
+        payload = json.dumps(state.to_dict())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (id, state, touched) VALUES (?, ?, ?)",
+                (session_id, payload, self.clock()),
+            )
+            self._saves += 1
+            if self.ttl is not None and self._saves % self.purge_every == 0:
+                self._purge()
+
+    def discard(self, session_id):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def stats(self):
+        """Row count only: tracker stats would mean decoding every row."""
+        with self._lock:
+            (sessions,) = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return {"sessions": sessions}
+
+    def purge_expired(self):
+        """Deletes expired rows; returns how many were removed."""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            return self._purge()
+
+    def _purge(self):
+        cursor = self._db.execute(
+            "DELETE FROM sessions WHERE touched < ?", (self.clock() - self.ttl,)
+        )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def repeat_options(max_entries=None, max_bytes=None, ttl=None):
+    """
+    session_options for the RepeatTracker settings that were given.
+    max_entries may not be below HISTORY_SIZE: the tracker would then forget
+    inputs the history still treats as repeats.
+    """
+    if max_entries is not None and max_entries < HISTORY_SIZE:
+        raise ValueError(f"max_entries must be at least {HISTORY_SIZE}")
+    options = {"max_entries": max_entries, "max_bytes": max_bytes, "ttl": ttl}
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def open_session_store(path=None, compact=False, max_sessions=10000, session_options=None):
+    """The store the command-line servers use: SQLite at path, else in memory.
+
+    Either way sessions expire after DEFAULT_TTL seconds idle. session_options
+    set the RepeatTracker budget (max_entries, max_bytes, ttl); CompactSession
+    has a fixed size and takes none.
+    """
+    if compact and session_options:
+        raise ValueError("Repeat tracker settings do not apply to compact sessions")
+    factory = CompactSession if compact else SessionState
+    if path:
+        return SQLiteSessionStore(path, ttl=DEFAULT_TTL, session_factory=factory,
+                                  session_options=session_options)
+    return MemorySessionStore(max_sessions=max_sessions, session_factory=factory,
+                              session_options=session_options)
@@ -1,31 +1,66 @@
 package challenges
 
 import (
+	"crypto/rand"
+	"encoding/hex"
 	"encoding/json"
 	"net/http"
-	"os/exec"
+	"strconv"
 )
 
 type SnarkyAIRequest struct {
 	Input string `json:"input"`
+	// Session keeps one conversation's repeat history apart from everyone
+	// else's. Without it the handler falls back to a session cookie.
+	Session string `json:"session,omitempty"`
 }
 
+// snarkySessionCookie holds the session id of browsers that send none.
+const snarkySessionCookie = "snarky_session"
+
+// snarkyClient reaches the long-running Python engine (snarky_rpc.py) over a
+// Unix socket, starting it on first use. Input travels only as JSON data.
+var snarkyClient = func() *SnarkyRPCClient {
+	client := NewSnarkyRPCClient(snarkySocketPath(), 16)
+	client.Launch = launchSnarkyRPCServer
+	return client
+}()
+
+// snarkyPrompts answers the prompt endpoint without the Python engine.
+var snarkyPrompts = NewSnarkyPromptPool("challenges/snarky_responses.json")
+
+// SnarkyAIPromptHandler answers GET with {"prompt": "..."}, or with
+// {"prompts": [...]} when a count query parameter (0 to 1000) is given.
 func SnarkyAIPromptHandler(w http.ResponseWriter, r *http.Request) {
 	if r.Method != http.MethodGet {
 		http.Error(w, "Only GET method is allowed", http.StatusMethodNotAllowed)
 		return
 	}
 
-	cmd := exec.Command("python3", "-c", "from SnarkyAI import SnarkyAI; print(SnarkyAI().get_opening_prompt())", "-u")
-	cmd.Dir = "challenges"
-	out, err := cmd.CombinedOutput()
-	if err != nil {
-		http.Error(w, string(out), http.StatusInternalServerError)
-		return
+	var body any
+	if raw := r.URL.Query().Get("count"); raw != "" {
+		count, err := strconv.Atoi(raw)
+		if err != nil || count < 0 || count > maxPromptTake {
+			http.Error(w, "count must be an integer from 0 to 1000", http.StatusBadRequest)
+			return
+		}
+		prompts, err := snarkyPrompts.Take(count)
+		if err != nil {
+			http.Error(w, err.Error(), http.StatusInternalServerError)
+			return
+		}
+		body = map[string][]string{"prompts": prompts}
+	} else {
+		prompt, err := snarkyPrompts.Prompt()
+		if err != nil {
+			http.Error(w, err.Error(), http.StatusInternalServerError)
+			return
+		}
+		body = map[string]string{"prompt": prompt}
 	}
 
 	w.Header().Set("Content-Type", "application/json")
-	json.NewEncoder(w).Encode(map[string]string{"prompt": string(out)})
+	json.NewEncoder(w).Encode(body)
 }
 
 func SnarkyAIHandler(w http.ResponseWriter, r *http.Request) {
@@ -40,14 +75,34 @@ func SnarkyAIHandler(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
-	cmd := exec.Command("python3", "-c", "from SnarkyAI import SnarkyAI; print(SnarkyAI().get_response(\""+req.Input+"\"))", "-u")
-	cmd.Dir = "challenges"
-	out, err := cmd.CombinedOutput()
+	response, err := snarkyClient.GetResponse(req.Input, snarkySession(w, r, req.Session))
 	if err != nil {
-		http.Error(w, string(out), http.StatusInternalServerError)
+		http.Error(w, err.Error(), http.StatusInternalServerError)
 		return
 	}
 
 	w.Header().Set("Content-Type", "application/json")
-	json.NewEncoder(w).Encode(map[string]string{"response": string(out)})
+	json.NewEncoder(w).Encode(map[string]string{"response": response})
+}
+
+// snarkySession returns the conversation id for r: the one in the request
+// body, else the session cookie's, else a new random one set as the cookie.
+func snarkySession(w http.ResponseWriter, r *http.Request, requested string) string {
+	if requested != "" {
+		return requested
+	}
+	if cookie, err := r.Cookie(snarkySessionCookie); err == nil && cookie.Value != "" {
+		return cookie.Value
+	}
+	var id [16]byte
+	rand.Read(id[:])
+	session := hex.EncodeToString(id[:])
+	http.SetCookie(w, &http.Cookie{
+		Name:     snarkySessionCookie,
+		Value:    session,
+		Path:     "/",
+		HttpOnly: true,
+		SameSite: http.SameSiteLaxMode,
+	})
+	return session
 }
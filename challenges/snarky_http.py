@@ -0,0 +1,389 @@
+"""
+asyncio HTTP front-end for SnarkyAI, speaking the same contract as
+snarky_ai_handler.go:
+
+    python -m snarky_http --port 8081              # or --unix /tmp/snarky.sock
+    GET  /prompt                          -> {"prompt": "..."}
+    GET  /prompt?count=N                  -> {"prompts": ["...", ...]}
+    POST /response  {"input": "..."}      -> {"response": "..."}
+    GET  /metrics                         -> Prometheus text (with --metrics)
+
+POST /response also takes an optional "session" string to keep each
+conversation's repeat history apart, like the worker protocol.
+With --metrics every get_response is timed per stage and per check (see
+snarky_metrics.py) and /metrics serves the result; it is only available with
+the in-process thread pool, not --processes. --early-exit turns on SnarkyAI's
+early_exit reply selection, in the thread pool's SnarkyAI or in every worker.
+
+Greetings come straight from a PromptService (see snarky_prompts.py) on the
+event loop, so /prompt never waits behind get_response. The event loop
+otherwise only parses HTTP; get_response runs in an executor. By default
+that is a thread pool sharing one thread-safe SnarkyAI (free-threaded builds
+use every core); --processes N hands the work to a SnarkyPool of worker
+processes instead. At most --concurrency requests run at once and at most
+--max-pending are admitted; beyond that the server answers 503 with
+Retry-After rather than queueing without bound. A request that takes longer
+than --timeout gets 504, but its work keeps its slot and its place in the
+pending count until the thread or worker running it is done. Connections are
+kept alive (HTTP/1.1 default, or "Connection: keep-alive" on HTTP/1.0) until
+--keepalive seconds of idleness.
+
+Only what the contract needs is implemented: no chunked request bodies, no
+pipelining beyond answering requests in order, no TLS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+from SnarkyAI import SnarkyAI
+from snarky_metrics import SnarkyMetrics
+from snarky_pool import (
+    WORKER_COMMAND, PoolBusyError, PoolDrainingError, PoolError, SnarkyPool,
+    WorkerUnavailableError,
+)
+from snarky_prompts import MAX_TAKE, PromptService
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 16 * 1024
+
+
+class TextBody(str):
+    """A handler result sent as text/plain instead of JSON."""
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HTTPError(RuntimeError):
+    """An error answered with the given HTTP status and extra headers."""
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class SnarkyHTTPServer:
+    """Serves /prompt and /response from an executor behind a concurrency limit."""
+    def __init__(self, ai=None, pool=None, threads=None, concurrency=32, max_pending=256,
+                 timeout=5.0, keepalive=15.0, prompts=None):
+        self.pool = pool
+        self.ai = ai if ai is not None or pool is not None else SnarkyAI(thread_safe=True)
+        if prompts is None:
+            prompts = PromptService(self.ai.registry, rng=self.ai.rng) if self.ai else PromptService()
+        self.prompts = prompts
+        self.executor = None if pool is not None else ThreadPoolExecutor(
+            max_workers=threads or min(32, (os.cpu_count() or 1) + 4),
+            thread_name_prefix="snarky-http",
+        )
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.keepalive = keepalive
+
+        self.pending = 0
+        self.served = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._slots = None
+        self._server = None
+
+    # --- LIFECYCLE ---
+
+    async def start(self, host="127.0.0.1", port=8081, unix=None):
+        self._slots = asyncio.Semaphore(self.concurrency)
+        if unix:
+            if os.path.exists(unix):
+                os.unlink(unix)
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=unix, limit=MAX_HEADER_BYTES
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host, port, limit=MAX_HEADER_BYTES
+            )
+        return self._server
+
+    async def serve_forever(self, **address):
+        server = await self.start(**address)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- CONNECTIONS ---
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), self.keepalive)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                if request is None:
+                    return
+
+                method, path, version, headers, body = request
+                keep_alive = _wants_keep_alive(version, headers)
+                try:
+                    status, payload, extra = HTTPStatus.OK, await self._dispatch(method, path, body), {}
+                except HTTPError as exc:
+                    status, payload, extra = exc.status, {"error": str(exc)}, exc.headers
+                except Exception as exc:
+                    status, payload, extra = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}, {}
+
+                writer.write(_render(status, payload, keep_alive, extra))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except HTTPError as exc:
+            # Unparseable request: answer once and drop the connection.
+            writer.write(_render(exc.status, {"error": str(exc)}, False, exc.headers))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _dispatch(self, method, path, body):
+        path, _, query = path.partition("?")
+        if path == "/prompt":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Only GET method is allowed",
+                                {"Allow": "GET"})
+            count = _parse_count(query)
+            self.served += 1
+            if count is None:
+                return {"prompt": self.prompts.get_opening_prompt()}
+            return {"prompts": self.prompts.take(count)}
+        if path == "/response":
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Only POST method is allowed",
+                                {"Allow": "POST"})
+            user_input, session = _parse_response_body(body)
+            return {"response": await self._run(user_input, session)}
+        if path == "/metrics":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Only GET method is allowed",
+                                {"Allow": "GET"})
+            if self.ai is None or self.ai.metrics is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "Metrics are disabled")
+            return TextBody(self.ai.metrics.render_prometheus())
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+
+    # --- EXECUTION ---
+
+    async def _run(self, user_input, session):
+        """Runs one get_response off the loop, with admission control and a deadline."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many requests in flight",
+                            {"Retry-After": "1"})
+        self.pending += 1
+        try:
+            return await asyncio.wait_for(self._call(user_input, session), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "SnarkyAI took too long to insult you")
+
+    async def _call(self, user_input, session):
+        """
+        Runs get_response under a concurrency slot. The slot and the pending count
+        are given back when the work itself finishes, not when the request gives
+        up on it, so a 504 does not let more work run than --concurrency allows.
+        """
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            self.pending -= 1
+            raise
+        try:
+            future = self._submit(user_input, session)
+        except BaseException:
+            self._finish(None)
+            raise
+        future.add_done_callback(self._finish)
+        try:
+            # Shielded: timing out abandons the wait, never the running work.
+            result = await asyncio.shield(future)
+        except PoolError as exc:
+            raise HTTPError(HTTPStatus.BAD_GATEWAY, str(exc))
+        self.served += 1
+        return result
+
+    def _submit(self, user_input, session):
+        """Starts get_response on the pool or executor; returns an asyncio future."""
+        if self.pool is None:
+            loop = asyncio.get_running_loop()
+            return loop.run_in_executor(self.executor, self.ai.get_response, user_input, session)
+        try:
+            future = self.pool.submit("get_response", session_id=session, input=user_input)
+        except (PoolBusyError, PoolDrainingError, WorkerUnavailableError) as exc:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, str(exc), {"Retry-After": "1"})
+        return asyncio.wrap_future(future)
+
+    def _finish(self, future):
+        self._slots.release()
+        self.pending -= 1
+        if future is not None and not future.cancelled():
+            future.exception()  # retrieved, so a failure after a 504 is not logged as lost
+
+    def stats(self):
+        return {
+            "pending": self.pending,
+            "served": self.served,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+# --- HTTP PARSING ---
+
+async def _read_request(reader):
+    """Reads one request; returns None on a clean end of stream."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial.strip():
+            return None
+        raise
+    except asyncio.LimitOverrunError:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request head too large")
+    if len(head) > MAX_HEADER_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request head too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+    if version not in ("HTTP/1.0", "HTTP/1.1"):
+        raise HTTPError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, "Only HTTP/1.0 and HTTP/1.1")
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Chunked bodies are not supported")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0 or length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+def _parse_response_body(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid request body")
+    if not isinstance(data, dict) or not isinstance(data.get("input"), str):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object with a string 'input'")
+    session = data.get("session")
+    if session is not None and not isinstance(session, str):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'session' must be a string")
+    return data["input"], session
+
+
+def _parse_count(query):
+    """The count parameter of a /prompt query string, or None without one."""
+    values = parse_qs(query).get("count")
+    if not values:
+        return None
+    try:
+        count = int(values[0])
+    except ValueError:
+        count = -1
+    if not 0 <= count <= MAX_TAKE:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'count' must be an integer from 0 to {MAX_TAKE}")
+    return count
+
+
+def _wants_keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.1":
+        return connection != "close"
+    return connection == "keep-alive"
+
+
+def _render(status, payload, keep_alive, extra_headers):
+    if isinstance(payload, TextBody):
+        body, content_type = payload.encode("utf-8"), payload.content_type
+    else:
+        body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+    status = HTTPStatus(status)
+    head = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    head += [f"{name}: {value}" for name, value in extra_headers.items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve SnarkyAI over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to bind")
+    parser.add_argument("--port", type=int, default=8081, help="TCP port to bind")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--threads", type=int, help="executor threads (default: cpu count + 4, max 32)")
+    parser.add_argument("--processes", type=int, metavar="N",
+                        help="run get_response in a SnarkyPool of N worker processes instead")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests running at once")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="requests admitted before answering 503")
+    parser.add_argument("--timeout", type=float, default=5.0, help="per-request deadline in seconds")
+    parser.add_argument("--keepalive", type=float, default=15.0, help="idle keep-alive in seconds")
+    parser.add_argument("--metrics", action="store_true",
+                        help="time every request and serve GET /metrics (not with --processes)")
+    parser.add_argument("--early-exit", action="store_true",
+                        help="pick each reply before building its candidate pool (SnarkyAI early_exit)")
+    args = parser.parse_args(argv)
+    if args.metrics and args.processes:
+        parser.error("--metrics cannot be combined with --processes")
+
+    pool = ai = None
+    if args.processes:
+        command = WORKER_COMMAND + (("--early-exit",) if args.early_exit else ())
+        pool = SnarkyPool(size=args.processes, command=command)
+    elif args.metrics or args.early_exit:
+        ai = SnarkyAI(thread_safe=True, metrics=SnarkyMetrics() if args.metrics else None,
+                      early_exit=args.early_exit)
+
+    server = SnarkyHTTPServer(ai=ai, pool=pool, threads=args.threads, concurrency=args.concurrency,
+                              max_pending=args.max_pending, timeout=args.timeout,
+                              keepalive=args.keepalive)
+    address = {"unix": args.unix} if args.unix else {"host": args.host, "port": args.port}
+    try:
+        asyncio.run(server.serve_forever(**address))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if pool is not None:
+            pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Latency and match metrics for SnarkyAI.get_response.
+
+    metrics = SnarkyMetrics()
+    ai = SnarkyAI(metrics=metrics)
+    ai.get_response("why is the sky blue?")
+    metrics.snapshot()            # nested dict, see below
+    metrics.render_prometheus()   # Prometheus text exposition format
+
+Each get_response call gets a RequestTimer that records the wall time of
+every stage it reaches:
+
+    validate       the 300-character cap
+    sanitize       sanitize_expressive_fort_knox and lower-casing
+    long_question  _check_long_question
+    repeat         the session's repeat check (load, observe, save)
+    cache          the response cache lookup
+    checks         running the checks on a cache miss
+    select         picking the reply (or a repeat/default reply)
+
+plus the time each check takes on a cache miss (grammar_and_style,
+misspellings, nonsense, keywords), how often each check matched, and which
+keyword topics matched. Checks only run, and so are only timed, on a cache
+miss, but matches are counted for every request that reaches the checks:
+response cache entries remember which checks and topics matched.
+Requests stop at their first early exit, so the later stages only count the
+requests that reached them. get_responses is not instrumented.
+
+A timer collects its laps locally and merges them into the shared metrics
+under one lock when the request finishes, so one SnarkyMetrics can serve a
+thread_safe SnarkyAI. Without metrics (the default) get_response only pays for
+a few "is None" tests.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds; one request is usually tens of microseconds.
+DEFAULT_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, Prometheus style."""
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def to_dict(self):
+        buckets = {}
+        running = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            running += count
+            buckets["+Inf" if bound == float("inf") else repr(bound)] = running
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class RequestTimer:
+    """Collects one request's laps; SnarkyMetrics merges them on finish()."""
+    __slots__ = ("metrics", "started", "last", "stages", "checks", "hits", "topics")
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.started = self.last = metrics.clock()
+        self.stages = []
+        self.checks = []
+        self.hits = ()
+        self.topics = ()
+
+    def lap(self, stage):
+        """Charges the time since the previous lap to stage."""
+        now = self.metrics.clock()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def check(self, name, seconds):
+        self.checks.append((name, seconds))
+
+    def finish(self):
+        self.metrics.record(self, self.metrics.clock() - self.started)
+
+
+class SnarkyMetrics:
+    """Thread-safe counters and histograms for every instrumented request."""
+    def __init__(self, buckets=DEFAULT_BUCKETS, clock=time.perf_counter):
+        self.buckets = tuple(buckets)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def timer(self):
+        return RequestTimer(self)
+
+    def reset(self):
+        with self._lock:
+            self._requests = Histogram(self.buckets)
+            self._stages = {}
+            self._checks = {}
+            self._check_hits = {}
+            self._topics = {}
+
+    def record(self, timer, total):
+        """Merges a finished request's laps."""
+        with self._lock:
+            self._requests.observe(total)
+            for stage, seconds in timer.stages:
+                self._histogram(self._stages, stage).observe(seconds)
+            for name, seconds in timer.checks:
+                self._histogram(self._checks, name).observe(seconds)
+            for name in timer.hits:
+                self._check_hits[name] = self._check_hits.get(name, 0) + 1
+            for topic in timer.topics:
+                self._topics[topic] = self._topics.get(topic, 0) + 1
+
+    def _histogram(self, table, name):
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = Histogram(self.buckets)
+        return histogram
+
+    # --- EXPORT ---
+
+    def snapshot(self):
+        """Returns every metric as plain dicts (JSON-serializable)."""
+        with self._lock:
+            return {
+                "requests": self._requests.to_dict(),
+                "stages": {name: h.to_dict() for name, h in self._stages.items()},
+                "checks": {name: h.to_dict() for name, h in self._checks.items()},
+                "check_hits": dict(self._check_hits),
+                "topics": dict(self._topics),
+            }
+
+    def render_prometheus(self, prefix="snarky"):
+        """Returns every metric in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def histogram(name, help_text, label, series):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for value, data in series:
+                labels = f'{label}="{_escape(value)}",' if label else ""
+                for bound, count in data["buckets"].items():
+                    lines.append(f'{prefix}_{name}_bucket{{{labels}le="{bound}"}} {count}')
+                labels = labels.rstrip(",")
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{prefix}_{name}_sum{suffix} {data['sum']!r}")
+                lines.append(f"{prefix}_{name}_count{suffix} {data['count']}")
+
+        def counter(name, help_text, label, series):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for value, count in series:
+                lines.append(f'{prefix}_{name}{{{label}="{_escape(value)}"}} {count}')
+
+        histogram("request_seconds", "Wall time of get_response.", None,
+                  [(None, snapshot["requests"])])
+        histogram("stage_seconds", "Wall time per get_response stage.", "stage",
+                  sorted(snapshot["stages"].items()))
+        histogram("check_seconds", "Wall time per check on a response cache miss.", "check",
+                  sorted(snapshot["checks"].items()))
+        counter("check_hits_total", "Checks that produced a reply candidate, cache hits included.",
+                "check",
+                sorted(snapshot["check_hits"].items()))
+        counter("topic_matches_total", "Keyword topics that matched, cache hits included.", "topic",
+                sorted(snapshot["topics"].items()))
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,368 @@
+"""
+Multi-process pool of SnarkyAI workers (see snarky_worker.py).
+
+Each worker process holds its own SnarkyAI state, so requests are routed by a
+stable hash of their session id: every request of one conversation lands on
+the same worker and the repeat check keeps working, while different
+conversations spread across cores.
+
+    with SnarkyPool(size=4) as pool:
+        pool.get_response("why is the sky blue?", session_id="abc")
+        pool.reload_registry()  # every worker re-reads snarky_responses.json
+        pool.reload()  # drain in-flight work, then restart every worker
+
+A worker that dies is restarted automatically; requests that were in flight on
+it fail with WorkerCrashedError (and that worker's sessions start over).
+Restarts back off exponentially, from backoff seconds up to max_backoff, while
+a worker keeps dying within stable_after seconds of starting. While a worker
+is down, and after max_failures quick deaths in a row until its next process
+has stayed up for stable_after, submit() for its sessions fails at once with
+WorkerUnavailableError instead of feeding requests to a crash loop.
+"""
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_COMMAND = (sys.executable, "-m", "snarky_worker")
+
+
+class PoolError(RuntimeError):
+    """Base class for errors raised by SnarkyPool."""
+
+
+class PoolBusyError(PoolError):
+    """The worker owning this session already has max_pending requests queued."""
+
+
+class PoolDrainingError(PoolError):
+    """The pool is draining or closed and not accepting new requests."""
+
+
+class WorkerCrashedError(PoolError):
+    """The worker process exited before answering the request."""
+
+
+class WorkerUnavailableError(PoolError):
+    """The worker owning this session is down or keeps crashing."""
+
+
+class WorkerError(PoolError):
+    """The worker answered the request with an error."""
+
+
+class _Worker:
+    """One worker process plus the futures waiting on its replies."""
+    def __init__(self, index):
+        self.index = index
+        self.proc = None
+        # Futures of the current process only; each process's reader thread
+        # holds on to its own dict, so a replaced process still fails its own.
+        self.pending = {}
+        self.write_lock = threading.Lock()
+        self.stopping = False
+        self.restarts = 0
+        self.failures = 0
+        self.started = 0.0
+        self.restart_timer = None
+
+
+class SnarkyPool:
+    """Routes SnarkyAI requests to N worker processes by session id."""
+    def __init__(self, size=None, max_pending=64, command=WORKER_COMMAND, cwd=WORKER_DIR,
+                 backoff=0.1, max_backoff=30.0, stable_after=10.0, max_failures=5,
+                 clock=time.monotonic):
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+
+        self.size = size or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.command = list(command)
+        self.cwd = cwd
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.max_failures = max_failures
+        self.clock = clock
+
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._round_robin = itertools.count()
+        self._accepting = True
+        self._closed = False
+
+        self._workers = [_Worker(i) for i in range(self.size)]
+        for worker in self._workers:
+            self._start(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- PUBLIC API ---
+
+    def submit(self, method, session_id=None, **params):
+        """Queues a request and returns a Future for the worker's result."""
+        if session_id is not None:
+            params["session"] = session_id
+        with self._cond:
+            worker = self._route(session_id)
+        return self._send(worker, method, params)
+
+    def broadcast(self, method, **params):
+        """Sends one request to every worker; returns their Futures in worker order.
+
+        Broadcasts are control requests, so they are not held to max_pending. A
+        worker that is down gets a Future already failed with WorkerUnavailableError.
+        """
+        futures = []
+        for worker in self._workers:
+            try:
+                futures.append(self._send(worker, method, params, limit=False))
+            except WorkerUnavailableError as exc:
+                future = Future()
+                future.set_exception(exc)
+                futures.append(future)
+        return futures
+
+    def reload_registry(self, if_changed=False, timeout=None):
+        """Has every worker re-read its registry file in place, keeping its sessions.
+
+        Returns each worker's answer ("reloaded", or "unchanged" with if_changed);
+        raises the first worker's error, if any.
+        """
+        params = {"if_changed": True} if if_changed else {}
+        return [future.result(timeout) for future in self.broadcast("reload_registry", **params)]
+
+    def get_response(self, user_input, session_id=None, timeout=None):
+        """Blocking convenience wrapper around submit('get_response')."""
+        return self.submit("get_response", session_id, input=user_input).result(timeout)
+
+    def get_opening_prompt(self, timeout=None):
+        """Blocking convenience wrapper around submit('get_opening_prompt')."""
+        return self.submit("get_opening_prompt").result(timeout)
+
+    def drain(self, timeout=None):
+        """Stops accepting requests and waits for in-flight ones to finish.
+
+        Returns True once every worker is idle, or False if the timeout expired.
+        """
+        with self._cond:
+            self._accepting = False
+            return self._cond.wait_for(self._idle, timeout)
+
+    def resume(self):
+        """Starts accepting requests again after drain()."""
+        with self._cond:
+            if self._closed:
+                raise PoolDrainingError("Pool is closed")
+            self._accepting = True
+
+    def reload(self, timeout=None):
+        """Gracefully replaces every worker, e.g. to pick up new code or content.
+
+        Returns True once every worker has been replaced. If in-flight requests
+        do not finish within timeout, nothing is replaced, the pool resumes
+        accepting requests and False is returned.
+        """
+        if not self.drain(timeout):
+            self.resume()
+            return False
+        for worker in self._workers:
+            self._stop(worker, timeout)
+            self._start(worker)
+        self.resume()
+        return True
+
+    def close(self, timeout=None):
+        """Drains the pool and shuts every worker down."""
+        with self._cond:
+            if self._closed:
+                return
+        self.drain(timeout)
+        with self._cond:
+            self._closed = True
+        for worker in self._workers:
+            self._stop(worker, timeout)
+
+    def stats(self):
+        """Returns queue depth, pid, restart count and health for every worker."""
+        with self._cond:
+            return [
+                {
+                    "worker": worker.index,
+                    "pid": worker.proc.pid if worker.proc is not None else None,
+                    "pending": len(worker.pending),
+                    "restarts": worker.restarts,
+                    "failures": worker.failures,
+                    "available": self._available(worker),
+                }
+                for worker in self._workers
+            ]
+
+    # --- HELPER METHODS ---
+
+    def _send(self, worker, method, params, limit=True):
+        """Queues one request on worker and returns its Future."""
+        with self._cond:
+            if not self._accepting:
+                raise PoolDrainingError("Pool is not accepting requests")
+            if not self._available(worker):
+                raise WorkerUnavailableError(
+                    f"Worker {worker.index} is down after {worker.failures} crashes in a row"
+                )
+            if limit and len(worker.pending) >= self.max_pending:
+                raise PoolBusyError(
+                    f"Worker {worker.index} already has {self.max_pending} requests queued"
+                )
+            request_id = next(self._ids)
+            future = Future()
+            pending = worker.pending
+            pending[request_id] = future
+            proc = worker.proc
+
+        line = json.dumps({"id": request_id, "method": method, "params": params}) + "\n"
+        try:
+            with worker.write_lock:
+                proc.stdin.write(line)
+                proc.stdin.flush()
+        except (OSError, ValueError):
+            # The reader thread notices the exit and restarts the worker; this
+            # request simply never made it across.
+            self._fail(pending, request_id, WorkerCrashedError(f"Worker {worker.index} is gone"))
+        return future
+
+    def _route(self, session_id):
+        """Picks a worker: by stable session hash, or round-robin without a session."""
+        if session_id is None:
+            return self._workers[next(self._round_robin) % self.size]
+        # crc32 rather than hash(): str hashes are salted per process.
+        key = str(session_id).encode("utf-8")
+        return self._workers[zlib.crc32(key) % self.size]
+
+    def _idle(self):
+        return not any(worker.pending for worker in self._workers)
+
+    def _available(self, worker):
+        """False while the worker is down, or still proving itself after repeated crashes."""
+        if worker.proc is None:
+            return False
+        if self.clock() - worker.started >= self.stable_after:
+            worker.failures = 0
+        return worker.failures < self.max_failures
+
+    def _start(self, worker):
+        proc = subprocess.Popen(
+            self.command,
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        worker.proc = proc
+        worker.pending = {}
+        worker.started = self.clock()
+        worker.stopping = False
+        reader = threading.Thread(
+            target=self._read_replies,
+            args=(worker, proc, worker.pending),
+            name=f"snarky-pool-reader-{worker.index}",
+            daemon=True,
+        )
+        reader.start()
+
+    def _stop(self, worker, timeout=None):
+        with self._cond:
+            worker.stopping = True
+            proc = worker.proc
+            pending = worker.pending
+            if worker.restart_timer is not None:
+                worker.restart_timer.cancel()
+                worker.restart_timer = None
+        if proc is None:
+            return
+        try:
+            with worker.write_lock:
+                proc.stdin.write(json.dumps({"id": None, "method": "shutdown"}) + "\n")
+                proc.stdin.close()
+        except (OSError, ValueError):
+            pass
+        try:
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        # The reader thread does this too once it sees end of output; whichever
+        # gets there first fails the requests, so none outlive their process.
+        self._fail_all(worker, proc, pending)
+
+    def _read_replies(self, worker, proc, pending):
+        for line in proc.stdout:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+            with self._cond:
+                future = pending.pop(reply.get("id"), None)
+                self._cond.notify_all()
+            if future is None:
+                continue
+            if "error" in reply:
+                future.set_exception(WorkerError(reply["error"]))
+            else:
+                future.set_result(reply.get("result"))
+
+        proc.stdout.close()
+        proc.wait()
+        self._on_exit(worker, proc, pending)
+
+    def _on_exit(self, worker, proc, pending):
+        """Fails the dead process's requests and schedules a restart unless we are closing."""
+        with self._cond:
+            if worker.proc is proc and not (self._closed or worker.stopping):
+                if self.clock() - worker.started >= self.stable_after:
+                    worker.failures = 0
+                worker.failures += 1
+                delay = min(self.backoff * 2 ** (worker.failures - 1), self.max_backoff)
+                worker.proc = None
+                worker.restart_timer = threading.Timer(delay, self._restart, (worker,))
+                worker.restart_timer.daemon = True
+                worker.restart_timer.start()
+        self._fail_all(worker, proc, pending)
+
+    def _restart(self, worker):
+        with self._cond:
+            worker.restart_timer = None
+            if self._closed or worker.stopping or worker.proc is not None:
+                return
+            worker.restarts += 1
+            self._start(worker)
+
+    def _fail_all(self, worker, proc, pending):
+        """Fails every request still waiting on proc."""
+        with self._cond:
+            orphans = list(pending.values())
+            pending.clear()
+            self._cond.notify_all()
+        error = WorkerCrashedError(
+            f"Worker {worker.index} exited with status {proc.returncode}"
+        )
+        for future in orphans:
+            future.set_exception(error)
+
+    def _fail(self, pending, request_id, error):
+        with self._cond:
+            future = pending.pop(request_id, None)
+            self._cond.notify_all()
+        if future is not None:
+            future.set_exception(error)
@@ -0,0 +1,81 @@
+package challenges
+
+import (
+	"encoding/json"
+	"errors"
+	"math/rand"
+	"os"
+	"sync"
+	"time"
+)
+
+// maxPromptTake matches MAX_TAKE in snarky_prompts.py.
+const maxPromptTake = 1000
+
+// SnarkyPromptPool serves opening prompts straight from snarky_responses.json,
+// the same pool snarky_prompts.py draws from, so greeting someone never waits
+// for the Python engine to start. The file is re-read when its modification
+// time changes.
+type SnarkyPromptPool struct {
+	Path string
+
+	mu      sync.Mutex
+	modTime time.Time
+	prompts []string
+}
+
+// NewSnarkyPromptPool returns a pool reading path on first use.
+func NewSnarkyPromptPool(path string) *SnarkyPromptPool {
+	return &SnarkyPromptPool{Path: path}
+}
+
+// Take returns count prompts, each an independent uniform pick.
+func (p *SnarkyPromptPool) Take(count int) ([]string, error) {
+	prompts, err := p.load()
+	if err != nil {
+		return nil, err
+	}
+	out := make([]string, count)
+	for i := range out {
+		out[i] = prompts[rand.Intn(len(prompts))]
+	}
+	return out, nil
+}
+
+// Prompt returns one prompt.
+func (p *SnarkyPromptPool) Prompt() (string, error) {
+	prompts, err := p.Take(1)
+	if err != nil {
+		return "", err
+	}
+	return prompts[0], nil
+}
+
+func (p *SnarkyPromptPool) load() ([]string, error) {
+	info, err := os.Stat(p.Path)
+	if err != nil {
+		return nil, err
+	}
+
+	p.mu.Lock()
+	defer p.mu.Unlock()
+	if p.prompts != nil && info.ModTime().Equal(p.modTime) {
+		return p.prompts, nil
+	}
+
+	data, err := os.ReadFile(p.Path)
+	if err != nil {
+		return nil, err
+	}
+	var content struct {
+		OpeningPrompts []string `json:"opening_prompts"`
+	}
+	if err := json.Unmarshal(data, &content); err != nil {
+		return nil, err
+	}
+	if len(content.OpeningPrompts) == 0 {
+		return nil, errors.New("snarky prompts: no opening_prompts in " + p.Path)
+	}
+	p.prompts, p.modTime = content.OpeningPrompts, info.ModTime()
+	return p.prompts, nil
+}
@@ -0,0 +1,94 @@
+"""
+Opening prompts and default replies without the SnarkyAI engine.
+
+Greetings need nothing but the registry's reply pools, so this module imports
+only snarky_registry: no lexicon, no sanitizer, no session store. Front ends
+that just greet people (the /prompt endpoints) start in the time it takes to
+read snarky_responses.json:
+
+    prompts = PromptService(seed=42)
+    prompts.get_opening_prompt()      # same pick SnarkyAI(seed=42) would make
+    prompts.default_response()
+    prompts.take(100)                 # 100 prompts from the pre-rendered ring
+
+take() serves bulk requests from a ring buffer of ring_size prompts picked
+ahead of time with one rng.choices() call. The ring is consumed front to back
+and re-rendered once it is used up, so every prompt handed out is still an
+independent uniform pick from the pool, just drawn in batches.
+
+A PromptService is safe to share between threads. reload() swaps in a freshly
+loaded registry, like SnarkyAI.reload_registry().
+"""
+import random
+import threading
+
+from snarky_registry import default_registry, load_registry
+
+DEFAULT_RING_SIZE = 1024
+# Largest take() the servers accept in one request.
+MAX_TAKE = 1000
+
+
+class PromptService:
+    """Random picks from the opening-prompt and default-reply pools."""
+    def __init__(self, registry=None, rng=None, seed=None, ring_size=DEFAULT_RING_SIZE):
+        if ring_size < 1:
+            raise ValueError("ring_size must be at least 1")
+
+        self.registry = registry if registry is not None else default_registry()
+        # Same generator rules as SnarkyAI: injected, seeded, or the module's own.
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        self.rng = rng
+
+        self.ring_size = ring_size
+        self._ring = ()
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    @property
+    def opening_prompts(self):
+        return self.registry.opening_prompts
+
+    @property
+    def default_responses(self):
+        return self.registry.default_responses
+
+    def get_opening_prompt(self, rng=None):
+        """One grumpy, sarcastic greeting."""
+        return (rng or self.rng).choice(self.registry.opening_prompts)
+
+    def default_response(self, rng=None):
+        """One of the replies get_response falls back to when nothing matches."""
+        return (rng or self.rng).choice(self.registry.default_responses)
+
+    def take(self, count):
+        """Returns count opening prompts from the pre-rendered ring."""
+        if count < 0:
+            raise ValueError("count must not be negative")
+        out = []
+        with self._lock:
+            while len(out) < count:
+                if self._cursor >= len(self._ring):
+                    self._render()
+                end = min(len(self._ring), self._cursor + count - len(out))
+                out.extend(self._ring[self._cursor:end])
+                self._cursor = end
+        return out
+
+    def prerender(self):
+        """Fills the ring now, so the first take() does not pay for it."""
+        with self._lock:
+            self._render()
+
+    def reload(self, path=None):
+        """Swaps in freshly loaded pools and drops prompts rendered from the old ones."""
+        registry = load_registry(path or self.registry.path)
+        with self._lock:
+            self.registry = registry
+            self._ring = ()
+            self._cursor = 0
+
+    def _render(self):
+        self._ring = tuple(self.rng.choices(self.registry.opening_prompts, k=self.ring_size))
+        self._cursor = 0
@@ -0,0 +1,99 @@
+package challenges
+
+import (
+	"encoding/json"
+	"net/http"
+	"net/http/httptest"
+	"os"
+	"path/filepath"
+	"testing"
+	"time"
+)
+
+func writePrompts(t *testing.T, path string, prompts ...string) {
+	data, err := json.Marshal(map[string]any{"opening_prompts": prompts})
+	if err != nil {
+		t.Fatal(err)
+	}
+	if err := os.WriteFile(path, data, 0o644); err != nil {
+		t.Fatal(err)
+	}
+}
+
+func TestSnarkyPromptPoolTakesFromFile(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "responses.json")
+	writePrompts(t, path, "Oh. It's you.", "What now?")
+	pool := NewSnarkyPromptPool(path)
+
+	prompts, err := pool.Take(200)
+	if err != nil {
+		t.Fatal(err)
+	}
+	seen := map[string]int{}
+	for _, prompt := range prompts {
+		seen[prompt]++
+	}
+	if len(prompts) != 200 || len(seen) != 2 || seen["Oh. It's you."] == 0 || seen["What now?"] == 0 {
+		t.Errorf("Take(200) drew %v, want 200 picks from both prompts", seen)
+	}
+}
+
+func TestSnarkyPromptPoolReloadsChangedFile(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "responses.json")
+	writePrompts(t, path, "old")
+	pool := NewSnarkyPromptPool(path)
+	if prompt, _ := pool.Prompt(); prompt != "old" {
+		t.Fatalf("Prompt() = %q, want %q", prompt, "old")
+	}
+
+	writePrompts(t, path, "new")
+	later := time.Now().Add(time.Minute)
+	if err := os.Chtimes(path, later, later); err != nil {
+		t.Fatal(err)
+	}
+	if prompt, _ := pool.Prompt(); prompt != "new" {
+		t.Errorf("Prompt() after rewrite = %q, want %q", prompt, "new")
+	}
+}
+
+func TestSnarkyPromptPoolRejectsEmptyPool(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "responses.json")
+	writePrompts(t, path)
+	if _, err := NewSnarkyPromptPool(path).Prompt(); err == nil {
+		t.Error("Prompt() on an empty pool succeeded, want an error")
+	}
+}
+
+func TestSnarkyAIPromptHandler(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "responses.json")
+	writePrompts(t, path, "Ugh. Fine. What is it?")
+	saved := snarkyPrompts
+	snarkyPrompts = NewSnarkyPromptPool(path)
+	defer func() { snarkyPrompts = saved }()
+
+	tests := []struct {
+		method string
+		target string
+		status int
+		body   string
+	}{
+		{http.MethodGet, "/prompt", http.StatusOK, `{"prompt":"Ugh. Fine. What is it?"}`},
+		{http.MethodGet, "/prompt?count=2", http.StatusOK,
+			`{"prompts":["Ugh. Fine. What is it?","Ugh. Fine. What is it?"]}`},
+		{http.MethodGet, "/prompt?count=0", http.StatusOK, `{"prompts":[]}`},
+		{http.MethodGet, "/prompt?count=1001", http.StatusBadRequest, ""},
+		{http.MethodGet, "/prompt?count=lots", http.StatusBadRequest, ""},
+		{http.MethodPost, "/prompt", http.StatusMethodNotAllowed, ""},
+	}
+	for _, tt := range tests {
+		recorder := httptest.NewRecorder()
+		SnarkyAIPromptHandler(recorder, httptest.NewRequest(tt.method, tt.target, nil))
+		if recorder.Code != tt.status {
+			t.Errorf("%s %s: status %d, want %d", tt.method, tt.target, recorder.Code, tt.status)
+			continue
+		}
+		if tt.body != "" && recorder.Body.String() != tt.body+"\n" {
+			t.Errorf("%s %s: body %q, want %q", tt.method, tt.target, recorder.Body.String(), tt.body)
+		}
+	}
+}
@@ -0,0 +1,129 @@
+"""
+Loads SnarkyAI's topics, trigger terms and reply pools from snarky_responses.json.
+
+Everything is read once into tuples, so the check methods pick from prebuilt
+pools instead of rebuilding list literals on every request:
+
+    registry = load_registry()
+    random.choice(registry.default_responses)
+    registry.keyword_matcher.match("tell me about cats")   # {'explain', 'pets'}
+    registry.misspellings["plz"]                         # (7, "PLZ? PLLLLZZZ? ...")
+
+A ResponseRegistry is an immutable snapshot. To change the content without
+restarting, load a new one and swap it in (SnarkyAI.reload_registry() does this),
+so a request in flight always sees one consistent version. is_stale() says
+whether the file has changed since the snapshot was read (the worker's
+"reload_registry" with "if_changed" uses it).
+
+Large correction dictionaries can live beside the JSON as tab-separated files
+listed under "misspelling_files"; they are ranked after the inline entries.
+"""
+import json
+import os
+
+from keyword_matcher import TOKEN_RE, KeywordMatcher
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snarky_responses.json")
+
+
+class ResponseRegistry:
+    """Immutable snapshot of every reply pool and trigger table."""
+    def __init__(self, data, path=None, mtime=None):
+        self.path = path
+        self.mtime = mtime
+
+        self.opening_prompts = _pool(data["opening_prompts"])
+        self.default_responses = _pool(data["default_responses"])
+        self.long_question = _pool(data["long_question"])
+        self.nonsense = _pool(data["nonsense"])
+
+        repeats = data["repeats"]
+        self.repeat_twice = _pool(repeats["2"])
+        self.repeat_thrice = _pool(repeats["3"])
+        self.repeat_more = _pool(repeats["more"])
+
+        grammar = data["grammar"]
+        self.not_a_question = _pool(grammar["not_a_question"])
+        self.yelling = _pool(grammar["yelling"])
+        self.no_caps = _pool(grammar["no_caps"])
+        self.punctuation = _pool(grammar["punctuation"])
+
+        # Misspellings map each whole word to (rank, correction). Inline entries
+        # come first, then any "misspelling_files" in order; when a text holds
+        # several, the lowest rank (the earliest entry) wins.
+        self.misspelling_insults = _pool(data["misspelling_insults"])
+        base = os.path.dirname(os.path.abspath(path)) if path else os.getcwd()
+        entries = list(data["misspellings"])
+        for name in data.get("misspelling_files", ()):
+            entries.extend(load_misspellings(os.path.join(base, name)))
+        self.misspellings = {}
+        for word, response in entries:
+            if not TOKEN_RE.fullmatch(word):
+                raise ValueError(f"Misspelling {word!r} must be a single word")
+            self.misspellings.setdefault(word, (len(self.misspellings), response))
+
+        # Topics pool their replies in file order.
+        self.keyword_topics = tuple(
+            (topic["name"], topic["kind"], tuple(topic["terms"])) for topic in data["topics"]
+        )
+        self.topic_responses = tuple(
+            (topic["name"], _pool(topic["responses"])) for topic in data["topics"]
+        )
+        self.keyword_matcher = KeywordMatcher(self.keyword_topics)
+
+        # The same replies by topic name, for looking up only the matched topics.
+        self.topic_pools = {}
+        for name, responses in self.topic_responses:
+            self.topic_pools[name] = self.topic_pools.get(name, ()) + responses
+
+    def is_stale(self):
+        """True if the file this snapshot came from has changed since."""
+        if self.path is None:
+            return False
+        try:
+            return os.stat(self.path).st_mtime_ns != self.mtime
+        except OSError:
+            return False
+
+
+_default = None
+
+
+def default_registry():
+    """Returns the shared registry for DEFAULT_PATH, loading it on first use."""
+    global _default
+    if _default is None:
+        _default = load_registry()
+    return _default
+
+
+def load_registry(path=DEFAULT_PATH):
+    """Reads a registry file into a ResponseRegistry."""
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return ResponseRegistry(data, path=path, mtime=mtime)
+
+
+def load_misspellings(path):
+    """
+    Reads a correction dictionary: one "word<TAB>correction" per line,
+    blank lines and lines starting with # ignored. Returns (word, correction) pairs.
+    """
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            word, sep, response = line.partition("\t")
+            if not sep:
+                raise ValueError(f"{path}:{number}: expected word<TAB>correction")
+            entries.append((word, response))
+    return entries
+
+
+def _pool(responses):
+    if not responses:
+        raise ValueError("Reply pools must not be empty")
+    return tuple(responses)
@@ -0,0 +1,291 @@
+"""
+Replays a JSONL request log through SnarkyAI and writes the replies as JSONL.
+
+    python -m snarky_replay traffic.jsonl > replies.jsonl
+    zcat day.jsonl.gz | python -m snarky_replay - --processes 8 --unordered
+
+Every input line is a JSON object with a string "input" and optionally a
+"session" string and an "id" of any type, which is copied to the output:
+
+    {"id": 17, "session": "abc", "input": "why is the sky blue?"}
+
+Every output line carries the input's line number and one reply or error,
+plus how long each stage took for that record in milliseconds:
+
+    {"line": 1, "id": 17, "session": "abc", "input": "why is the sky blue?",
+     "response": "...", "timings": {"parse_ms": 0.01, "respond_ms": 0.12}}
+    {"line": 2, "error": "Invalid JSON: ...", "timings": {"parse_ms": 0.01}}
+
+Input is read as bytes and decoded line by line, so a line that is not valid
+UTF-8 becomes an "Invalid UTF-8" error record instead of ending the replay.
+
+A summary with the total time per stage (including writing the output) goes to
+stderr at the end. The totals are sums over records, so with --processes the
+respond total can exceed the wall time.
+
+The pipeline is a chain of generators, so only --window records are ever in
+flight and memory stays flat however long the log is. By default one
+in-process SnarkyAI answers the records in order. --processes N fans them out
+to a SnarkyPool instead: records of one session still go to the same worker in
+order, so repeat checks behave the same, while records without a session are
+spread round-robin and no longer share one conversation. Output stays in input
+order unless --unordered, which writes each reply as soon as it is ready. In
+pool mode respond_ms is the time from submitting a record to its reply,
+queueing included. A record the pool refuses or fails (its worker crashed, or
+is down waiting to restart) becomes an error record; the replay goes on.
+
+Session state lives in memory (one LRU per process) unless --sessions points
+at a SQLite file.
+"""
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from SnarkyAI import SnarkyAI
+from session_store import SQLiteSessionStore
+from snarky_pool import WORKER_COMMAND, PoolError, SnarkyPool
+
+STAGES = ("parse", "respond", "write")
+
+
+class ReplayRecord:
+    """One input line on its way through the pipeline."""
+    __slots__ = ("line", "id", "session", "input", "response", "error", "timings",
+                 "_future", "_submitted")
+
+    def __init__(self, line):
+        self.line = line
+        self.id = None
+        self.session = None
+        self.input = None
+        self.response = None
+        self.error = None
+        self.timings = {}
+        self._future = None
+        self._submitted = None
+
+    def to_dict(self):
+        out = {"line": self.line}
+        if self.id is not None:
+            out["id"] = self.id
+        if self.session is not None:
+            out["session"] = self.session
+        if self.input is not None:
+            out["input"] = self.input
+        if self.error is None:
+            out["response"] = self.response
+        else:
+            out["error"] = self.error
+        out["timings"] = {f"{stage}_ms": round(seconds * 1000, 3) for stage, seconds in self.timings.items()}
+        return out
+
+
+# --- PIPELINE STAGES ---
+
+def read_records(lines):
+    """
+    Parses JSONL lines (str, or bytes decoded as UTF-8) into ReplayRecords;
+    bad lines become records with an error.
+    """
+    clock = time.perf_counter
+    for number, line in enumerate(lines, 1):
+        started = clock()
+        if not line.strip():
+            continue
+        record = ReplayRecord(number)
+        try:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            record.error = f"Invalid UTF-8: {exc}"
+        else:
+            try:
+                data = json.loads(line)
+            except ValueError as exc:
+                record.error = f"Invalid JSON: {exc}"
+            else:
+                _fill(record, data)
+        record.timings["parse"] = clock() - started
+        yield record
+
+
+def _fill(record, data):
+    if not isinstance(data, dict):
+        record.error = "Line must be a JSON object"
+        return
+    record.id = data.get("id")
+    session = data.get("session")
+    user_input = data.get("input")
+    if not isinstance(user_input, str):
+        record.error = "'input' must be a string"
+    elif session is not None and not isinstance(session, str):
+        record.error = "'session' must be a string"
+    else:
+        record.input = user_input
+        record.session = session
+
+
+def respond_local(records, ai):
+    """Answers each record in order with one in-process SnarkyAI."""
+    clock = time.perf_counter
+    for record in records:
+        if record.error is None:
+            started = clock()
+            record.response = ai.get_response(record.input, session_id=record.session)
+            record.timings["respond"] = clock() - started
+        yield record
+
+
+def respond_pool(records, pool, window, ordered=True):
+    """Answers records on a SnarkyPool with at most window of them in flight."""
+    in_flight = deque() if ordered else set()
+    for record in records:
+        if record.error is None:
+            _submit(pool, record)
+        if record._future is None and (not in_flight or not ordered):
+            # Bad lines and refused submits have nothing to wait for.
+            yield record
+            continue
+        if ordered:
+            in_flight.append(record)
+            while in_flight and (len(in_flight) >= window or _is_done(in_flight[0])):
+                yield _finish(in_flight.popleft())
+        else:
+            in_flight.add(record)
+            if len(in_flight) >= window:
+                yield from _finish_some(in_flight)
+
+    if ordered:
+        while in_flight:
+            yield _finish(in_flight.popleft())
+    else:
+        while in_flight:
+            yield from _finish_some(in_flight)
+
+
+def _submit(pool, record):
+    record._submitted = time.perf_counter()
+    try:
+        record._future = pool.submit("get_response", session_id=record.session, input=record.input)
+    except PoolError as exc:
+        # Refused up front, e.g. its worker is down waiting out a restart backoff.
+        record.error = str(exc)
+        _stamp_respond(record)
+        return
+    # Stamp completion from the pool's reader thread, not when we get around to it.
+    record._future.add_done_callback(lambda _, record=record: _stamp_respond(record))
+
+
+def _stamp_respond(record):
+    record.timings.setdefault("respond", time.perf_counter() - record._submitted)
+
+
+def _is_done(record):
+    return record._future is None or record._future.done()
+
+
+def _finish(record):
+    """Moves a submitted record's result or error from its future onto the record."""
+    future, record._future = record._future, None
+    if future is not None:
+        try:
+            record.response = future.result()
+        except PoolError as exc:
+            record.error = str(exc)
+        # Done callbacks run just after result() wakes up, so stamp here too.
+        _stamp_respond(record)
+    return record
+
+
+def _finish_some(in_flight):
+    """Waits for at least one record in the set and yields every finished one."""
+    wait([record._future for record in in_flight], return_when=FIRST_COMPLETED)
+    for record in [record for record in in_flight if _is_done(record)]:
+        in_flight.discard(record)
+        yield _finish(record)
+
+
+def write_records(records, out, totals=None):
+    """Writes each record as one JSON line; adds per-stage seconds into totals."""
+    clock = time.perf_counter
+    written = 0
+    for record in records:
+        started = clock()
+        out.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+        written += 1
+        if totals is not None:
+            for stage, seconds in record.timings.items():
+                totals[stage] += seconds
+            totals["write"] += clock() - started
+    return written
+
+
+def replay(lines, out, ai=None, pool=None, window=256, ordered=True):
+    """Runs the whole pipeline; returns (records written, seconds spent per stage)."""
+    totals = dict.fromkeys(STAGES, 0.0)
+    records = read_records(lines)
+    if pool is not None:
+        records = respond_pool(records, pool, window, ordered)
+    else:
+        records = respond_local(records, ai if ai is not None else SnarkyAI())
+    return write_records(records, out, totals), totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a JSONL request log through SnarkyAI.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("--processes", type=int, metavar="N",
+                        help="answer on a SnarkyPool of N worker processes")
+    parser.add_argument("--window", type=int, default=256,
+                        help="records in flight at once with --processes (default: 256)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="with --processes, write replies as they finish instead of in input order")
+    parser.add_argument("--sessions", metavar="PATH", help="SQLite file holding session state")
+    parser.add_argument("--seed", type=int, help="seed the reply picks, for reproducible replays")
+    args = parser.parse_args(argv)
+    if args.window < 1:
+        parser.error("--window must be at least 1")
+
+    # Bytes in, so read_records can report undecodable lines one at a time.
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    if sink is sys.stdout:
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    pool = ai = None
+    if args.processes:
+        command = list(WORKER_COMMAND)
+        if args.sessions:
+            command += ["--sessions", args.sessions]
+        if args.seed is not None:
+            command += ["--seed", str(args.seed)]
+        # No worker can have more queued than the whole window, so submit never
+        # hits PoolBusyError however the sessions are skewed.
+        pool = SnarkyPool(size=args.processes, max_pending=args.window, command=command)
+    else:
+        session_store = SQLiteSessionStore(args.sessions) if args.sessions else None
+        ai = SnarkyAI(session_store=session_store, seed=args.seed)
+
+    started = time.perf_counter()
+    try:
+        written, totals = replay(source, sink, ai, pool, args.window, not args.unordered)
+    finally:
+        if pool is not None:
+            pool.close()
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - started
+
+    stages = "  ".join(f"{stage} {seconds:.3f}s" for stage, seconds in totals.items())
+    print(f"{written} records in {elapsed:.3f}s  ({stages})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+SnarkyAI RPC server on a Unix domain socket, for the Go handlers.
+
+    python -m snarky_rpc [--socket /tmp/snarky.sock] [--sessions sessions.db]
+                         [--compact-sessions] [--max-sessions N]
+                         [--repeat-entries N] [--repeat-bytes N] [--repeat-ttl SECONDS]
+                         [--early-exit]
+
+Each message is a 4-byte big-endian length followed by that many bytes of
+UTF-8 JSON, in both directions. Requests and replies are the worker protocol's
+objects (see snarky_worker.py):
+
+    -> {"id": 1, "method": "get_response", "params": {"input": "why?", "session": "abc"}}
+    <- {"id": 1, "result": "Because I said so."}
+
+User input only ever travels as a JSON string value, never as code. A client
+keeps its connections open and may have one request outstanding per
+connection; concurrency comes from opening several (snarky_rpc_client.go keeps
+a pool). Every connection gets its own thread, all sharing one thread-safe
+SnarkyAI. "shutdown" is not available over the socket: the server runs until
+it is stopped.
+
+The frames are JSON rather than msgpack so the Go side needs nothing beyond
+its standard library; at these message sizes the encoding is a rounding error
+next to get_response itself.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+
+from session_store import open_session_store
+from snarky_worker import SnarkyWorker, add_repeat_arguments, parse_repeat_arguments
+
+DEFAULT_SOCKET = os.environ.get("SNARKY_RPC_SOCKET", "/tmp/snarky.sock")
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 1024 * 1024
+
+
+class FrameError(RuntimeError):
+    """The peer sent a frame that is truncated or over MAX_FRAME_BYTES."""
+
+
+def read_frame(sock_file):
+    """Reads one frame's payload; returns None on a clean end of stream."""
+    header = sock_file.read(FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < FRAME_HEADER.size:
+        raise FrameError("Truncated frame header")
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise FrameError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    payload = sock_file.read(length)
+    if len(payload) < length:
+        raise FrameError("Truncated frame")
+    return payload
+
+
+def encode_frame(message):
+    payload = json.dumps(message).encode("utf-8")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        worker = self.server.worker
+        while True:
+            try:
+                payload = read_frame(self.rfile)
+            except (FrameError, OSError):
+                return
+            if payload is None:
+                return
+
+            try:
+                request = json.loads(payload)
+            except ValueError as exc:
+                reply = {"id": None, "error": f"Invalid JSON: {exc}"}
+            else:
+                if isinstance(request, dict) and request.get("method") == "shutdown":
+                    reply = {"id": request.get("id"), "error": "shutdown is not available over RPC"}
+                else:
+                    reply = worker.handle(request)
+
+            try:
+                self.wfile.write(encode_frame(reply))
+            except OSError:
+                return
+
+
+class SnarkyRPCServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Thread-per-connection Unix socket server around one shared SnarkyWorker."""
+    daemon_threads = True
+
+    def __init__(self, path=DEFAULT_SOCKET, session_store=None, seed=None, early_exit=False):
+        if os.path.exists(path):
+            os.unlink(path)
+        self.worker = SnarkyWorker(session_store, seed, thread_safe=True, early_exit=early_exit)
+        super().__init__(path, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+class SnarkyRPCClient:
+    """Minimal blocking client over one connection, for scripts and benchmarks."""
+    def __init__(self, path=DEFAULT_SOCKET, timeout=5.0):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+
+    def call(self, method, **params):
+        """Sends one request and returns its result; raises RuntimeError on an error reply."""
+        self._next_id += 1
+        self._file.write(encode_frame({"id": self._next_id, "method": method, "params": params}))
+        self._file.flush()
+        payload = read_frame(self._file)
+        if payload is None:
+            raise FrameError("Server closed the connection")
+        reply = json.loads(payload)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve SnarkyAI over a Unix socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                        help="socket path (default: $SNARKY_RPC_SOCKET or /tmp/snarky.sock)")
+    parser.add_argument("--sessions", metavar="PATH", help="SQLite file holding session state")
+    parser.add_argument("--max-sessions", type=int, default=10000,
+                        help="sessions kept in memory without --sessions (default: 10000)")
+    parser.add_argument("--compact-sessions", action="store_true",
+                        help="store sessions as hashed CompactSessions")
+    add_repeat_arguments(parser)
+    parser.add_argument("--seed", type=int, help="seed the reply picks, for reproducible load tests")
+    parser.add_argument("--early-exit", action="store_true",
+                        help="pick each reply before building its candidate pool (SnarkyAI early_exit)")
+    args = parser.parse_args(argv)
+    session_options = parse_repeat_arguments(parser, args)
+
+    session_store = open_session_store(args.sessions, args.compact_sessions, args.max_sessions,
+                                       session_options)
+    with SnarkyRPCServer(args.socket, session_store, args.seed, args.early_exit) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
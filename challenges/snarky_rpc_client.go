@@ -0,0 +1,243 @@
+package challenges
+
+import (
+	"bufio"
+	"encoding/binary"
+	"encoding/json"
+	"errors"
+	"fmt"
+	"io"
+	"net"
+	"os"
+	"os/exec"
+	"sync"
+	"sync/atomic"
+	"time"
+)
+
+// SnarkyRPCClient talks to snarky_rpc.py over a Unix domain socket. Every
+// message is a 4-byte big-endian length followed by that many bytes of JSON.
+// Idle connections are kept in a small pool so a request costs one write and
+// one read instead of a process launch.
+type SnarkyRPCClient struct {
+	Path    string
+	Timeout time.Duration
+
+	// Launch, if set, starts the Python server when the socket cannot be
+	// dialed, at most once per relaunchInterval.
+	Launch func() error
+
+	idle       chan *rpcConn
+	nextID     uint64
+	launchMu   sync.Mutex
+	lastLaunch time.Time
+}
+
+type rpcConn struct {
+	conn   net.Conn
+	reader *bufio.Reader
+}
+
+type rpcRequest struct {
+	ID     uint64         `json:"id"`
+	Method string         `json:"method"`
+	Params map[string]any `json:"params,omitempty"`
+}
+
+type rpcReply struct {
+	ID     uint64          `json:"id"`
+	Result json.RawMessage `json:"result"`
+	Error  *string         `json:"error"`
+}
+
+const (
+	maxRPCFrame      = 1 << 20
+	relaunchInterval = 10 * time.Second
+)
+
+// NewSnarkyRPCClient returns a client keeping up to poolSize idle connections.
+func NewSnarkyRPCClient(path string, poolSize int) *SnarkyRPCClient {
+	return &SnarkyRPCClient{
+		Path:    path,
+		Timeout: 5 * time.Second,
+		idle:    make(chan *rpcConn, poolSize),
+	}
+}
+
+// Call sends one request and decodes its result into out.
+func (c *SnarkyRPCClient) Call(method string, params map[string]any, out any) error {
+	req := rpcRequest{ID: atomic.AddUint64(&c.nextID, 1), Method: method, Params: params}
+
+	rc, pooled, err := c.get()
+	if err != nil {
+		return err
+	}
+	reply, written, err := rc.roundTrip(req, c.Timeout)
+	if err != nil && pooled && !written {
+		// An idle connection may have gone stale (say the server restarted), so
+		// the request never got across: try once more on a fresh one. Once it
+		// was written it is never resent, since the server may already have
+		// acted on it (get_response counts repeats).
+		rc.conn.Close()
+		if rc, err = c.dial(); err != nil {
+			return err
+		}
+		reply, _, err = rc.roundTrip(req, c.Timeout)
+	}
+	if err != nil {
+		// The stream may be mid-frame; never hand this connection out again.
+		rc.conn.Close()
+		return err
+	}
+	c.put(rc)
+
+	if reply.Error != nil {
+		return errors.New(*reply.Error)
+	}
+	return json.Unmarshal(reply.Result, out)
+}
+
+// GetResponse asks the engine for a reply to input, optionally within a session.
+func (c *SnarkyRPCClient) GetResponse(input, session string) (string, error) {
+	params := map[string]any{"input": input}
+	if session != "" {
+		params["session"] = session
+	}
+	var result string
+	err := c.Call("get_response", params, &result)
+	return result, err
+}
+
+// GetOpeningPrompt asks the engine for a greeting.
+func (c *SnarkyRPCClient) GetOpeningPrompt() (string, error) {
+	var result string
+	err := c.Call("get_opening_prompt", nil, &result)
+	return result, err
+}
+
+// Close drops every idle connection.
+func (c *SnarkyRPCClient) Close() {
+	for {
+		select {
+		case rc := <-c.idle:
+			rc.conn.Close()
+		default:
+			return
+		}
+	}
+}
+
+// get returns an idle connection if there is one, else a new one.
+func (c *SnarkyRPCClient) get() (rc *rpcConn, pooled bool, err error) {
+	select {
+	case rc := <-c.idle:
+		return rc, true, nil
+	default:
+	}
+	rc, err = c.dial()
+	return rc, false, err
+}
+
+func (c *SnarkyRPCClient) dial() (*rpcConn, error) {
+	conn, err := net.DialTimeout("unix", c.Path, c.Timeout)
+	if err != nil && c.Launch != nil {
+		if err = c.launch(); err == nil {
+			conn, err = c.dialUntil(time.Now().Add(15 * time.Second))
+		}
+	}
+	if err != nil {
+		return nil, fmt.Errorf("snarky rpc: %w", err)
+	}
+	return &rpcConn{conn: conn, reader: bufio.NewReader(conn)}, nil
+}
+
+func (c *SnarkyRPCClient) put(rc *rpcConn) {
+	select {
+	case c.idle <- rc:
+	default:
+		rc.conn.Close()
+	}
+}
+
+// launch starts the server unless another caller just did; either way the
+// caller then waits for the socket to come up.
+func (c *SnarkyRPCClient) launch() error {
+	c.launchMu.Lock()
+	defer c.launchMu.Unlock()
+	if time.Since(c.lastLaunch) < relaunchInterval {
+		return nil
+	}
+	c.lastLaunch = time.Now()
+	return c.Launch()
+}
+
+// dialUntil retries while the freshly launched server loads its word lists.
+func (c *SnarkyRPCClient) dialUntil(deadline time.Time) (net.Conn, error) {
+	for {
+		conn, err := net.DialTimeout("unix", c.Path, c.Timeout)
+		if err == nil || time.Now().After(deadline) {
+			return conn, err
+		}
+		time.Sleep(50 * time.Millisecond)
+	}
+}
+
+// roundTrip writes req and reads its reply. written reports whether the whole
+// request frame was sent, i.e. whether the server may have seen it.
+func (rc *rpcConn) roundTrip(req rpcRequest, timeout time.Duration) (reply *rpcReply, written bool, err error) {
+	payload, err := json.Marshal(req)
+	if err != nil {
+		return nil, false, err
+	}
+	frame := make([]byte, 4+len(payload))
+	binary.BigEndian.PutUint32(frame, uint32(len(payload)))
+	copy(frame[4:], payload)
+
+	rc.conn.SetDeadline(time.Now().Add(timeout))
+	if _, err := rc.conn.Write(frame); err != nil {
+		return nil, false, err
+	}
+
+	var header [4]byte
+	if _, err := io.ReadFull(rc.reader, header[:]); err != nil {
+		return nil, true, err
+	}
+	length := binary.BigEndian.Uint32(header[:])
+	if length > maxRPCFrame {
+		return nil, true, fmt.Errorf("snarky rpc: frame of %d bytes is too large", length)
+	}
+	body := make([]byte, length)
+	if _, err := io.ReadFull(rc.reader, body); err != nil {
+		return nil, true, err
+	}
+
+	reply = new(rpcReply)
+	if err := json.Unmarshal(body, reply); err != nil {
+		return nil, true, err
+	}
+	if reply.ID != req.ID {
+		return nil, true, fmt.Errorf("snarky rpc: reply %d does not match request %d", reply.ID, req.ID)
+	}
+	return reply, true, nil
+}
+
+// snarkySocketPath is where snarky_rpc.py listens, matching its own default.
+func snarkySocketPath() string {
+	if path := os.Getenv("SNARKY_RPC_SOCKET"); path != "" {
+		return path
+	}
+	return "/tmp/snarky.sock"
+}
+
+// launchSnarkyRPCServer starts `python3 -m snarky_rpc` in the background.
+func launchSnarkyRPCServer() error {
+	cmd := exec.Command("python3", "-m", "snarky_rpc", "--socket", snarkySocketPath())
+	cmd.Dir = "challenges"
+	cmd.Stdout = os.Stdout
+	cmd.Stderr = os.Stderr
+	if err := cmd.Start(); err != nil {
+		return err
+	}
+	go cmd.Wait()
+	return nil
+}
@@ -0,0 +1,279 @@
+package challenges
+
+import (
+	"bufio"
+	"encoding/binary"
+	"encoding/json"
+	"io"
+	"net"
+	"net/http"
+	"net/http/httptest"
+	"path/filepath"
+	"strings"
+	"sync"
+	"sync/atomic"
+	"testing"
+	"time"
+)
+
+// fakeSnarkyServer speaks snarky_rpc.py's framing: it echoes get_response
+// input back, never answers "stall", answers unknown methods with an error,
+// and counts accepted connections and requests. With closeAfterReply it hangs
+// up after every reply and signals closed.
+type fakeSnarkyServer struct {
+	listener        net.Listener
+	accepted        int32
+	received        int32
+	closeAfterReply bool
+	closed          chan struct{}
+
+	mu       sync.Mutex
+	sessions []string
+}
+
+func startFakeSnarkyServer(t *testing.T, path string) *fakeSnarkyServer {
+	listener, err := net.Listen("unix", path)
+	if err != nil {
+		t.Fatal(err)
+	}
+	s := &fakeSnarkyServer{listener: listener, closed: make(chan struct{}, 16)}
+	go func() {
+		for {
+			conn, err := listener.Accept()
+			if err != nil {
+				return
+			}
+			atomic.AddInt32(&s.accepted, 1)
+			go s.serve(conn)
+		}
+	}()
+	t.Cleanup(func() { listener.Close() })
+	return s
+}
+
+func (s *fakeSnarkyServer) serve(conn net.Conn) {
+	defer conn.Close()
+	reader := bufio.NewReader(conn)
+	for {
+		var header [4]byte
+		if _, err := io.ReadFull(reader, header[:]); err != nil {
+			return
+		}
+		body := make([]byte, binary.BigEndian.Uint32(header[:]))
+		if _, err := io.ReadFull(reader, body); err != nil {
+			return
+		}
+
+		var req rpcRequest
+		json.Unmarshal(body, &req)
+		atomic.AddInt32(&s.received, 1)
+		reply := map[string]any{"id": req.ID}
+		switch req.Method {
+		case "stall":
+			continue
+		case "get_response":
+			session, _ := req.Params["session"].(string)
+			s.mu.Lock()
+			s.sessions = append(s.sessions, session)
+			s.mu.Unlock()
+			reply["result"] = req.Params["input"]
+		case "get_opening_prompt":
+			reply["result"] = "Oh. It's you."
+		default:
+			reply["error"] = "Unknown method: '" + req.Method + "'"
+		}
+
+		payload, _ := json.Marshal(reply)
+		frame := make([]byte, 4+len(payload))
+		binary.BigEndian.PutUint32(frame, uint32(len(payload)))
+		copy(frame[4:], payload)
+		if _, err := conn.Write(frame); err != nil {
+			return
+		}
+		if s.closeAfterReply {
+			conn.Close()
+			s.closed <- struct{}{}
+			return
+		}
+	}
+}
+
+func (s *fakeSnarkyServer) lastSession() string {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	if len(s.sessions) == 0 {
+		return ""
+	}
+	return s.sessions[len(s.sessions)-1]
+}
+
+func TestSnarkyRPCClientPassesInputAsData(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "snarky.sock")
+	startFakeSnarkyServer(t, path)
+	client := NewSnarkyRPCClient(path, 2)
+	defer client.Close()
+
+	inputs := []string{
+		`why is the sky blue?`,
+		`")); import os; os.system("rm -rf /") #`,
+		"emoji 😀 and \"quotes\" and \\backslashes\\ and\nnewlines",
+	}
+	for _, input := range inputs {
+		got, err := client.GetResponse(input, "abc")
+		if err != nil {
+			t.Fatalf("GetResponse(%q) error: %v", input, err)
+		}
+		if got != input {
+			t.Errorf("GetResponse(%q) = %q, want the input back unchanged", input, got)
+		}
+	}
+}
+
+func TestSnarkyRPCClientReusesConnections(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "snarky.sock")
+	server := startFakeSnarkyServer(t, path)
+	client := NewSnarkyRPCClient(path, 2)
+	defer client.Close()
+
+	for i := 0; i < 50; i++ {
+		if _, err := client.GetOpeningPrompt(); err != nil {
+			t.Fatal(err)
+		}
+	}
+	if accepted := atomic.LoadInt32(&server.accepted); accepted != 1 {
+		t.Errorf("sequential calls opened %d connections, want 1", accepted)
+	}
+}
+
+func TestSnarkyRPCClientReturnsErrorReplies(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "snarky.sock")
+	startFakeSnarkyServer(t, path)
+	client := NewSnarkyRPCClient(path, 2)
+	defer client.Close()
+
+	var result string
+	err := client.Call("frobnicate", nil, &result)
+	if err == nil || err.Error() != "Unknown method: 'frobnicate'" {
+		t.Errorf("Call(frobnicate) error = %v, want the server's error", err)
+	}
+	// The connection is still in sync after an error reply.
+	if _, err := client.GetOpeningPrompt(); err != nil {
+		t.Errorf("call after error reply failed: %v", err)
+	}
+}
+
+func TestSnarkyRPCClientLaunchesServerAndSurvivesRestart(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "snarky.sock")
+	client := NewSnarkyRPCClient(path, 2)
+	defer client.Close()
+
+	var server *fakeSnarkyServer
+	launches := 0
+	client.Launch = func() error {
+		launches++
+		server = startFakeSnarkyServer(t, path)
+		return nil
+	}
+
+	if _, err := client.GetOpeningPrompt(); err != nil {
+		t.Fatalf("first call error: %v", err)
+	}
+	if launches != 1 {
+		t.Fatalf("Launch called %d times, want 1", launches)
+	}
+
+	// Restart the server: the pooled connection is now stale.
+	server.listener.Close()
+	startFakeSnarkyServer(t, path)
+	if _, err := client.GetOpeningPrompt(); err != nil {
+		t.Errorf("call after restart error: %v", err)
+	}
+}
+
+func TestSnarkyRPCClientRetriesStaleConnection(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "snarky.sock")
+	server := startFakeSnarkyServer(t, path)
+	server.closeAfterReply = true
+	client := NewSnarkyRPCClient(path, 2)
+	defer client.Close()
+
+	if _, err := client.GetOpeningPrompt(); err != nil {
+		t.Fatal(err)
+	}
+	<-server.closed
+	// The pooled connection is closed on the server side, so the write fails
+	// and the request goes out once more on a fresh connection.
+	if _, err := client.GetOpeningPrompt(); err != nil {
+		t.Errorf("call on a stale connection error: %v", err)
+	}
+	if received := atomic.LoadInt32(&server.received); received != 2 {
+		t.Errorf("server received %d requests, want 2", received)
+	}
+}
+
+func TestSnarkyRPCClientNeverResendsWrittenRequests(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "snarky.sock")
+	server := startFakeSnarkyServer(t, path)
+	client := NewSnarkyRPCClient(path, 2)
+	client.Timeout = 100 * time.Millisecond
+	defer client.Close()
+
+	if _, err := client.GetOpeningPrompt(); err != nil {
+		t.Fatal(err)
+	}
+	var result string
+	if err := client.Call("stall", nil, &result); err == nil {
+		t.Fatal("Call(stall) succeeded, want a timeout")
+	}
+	time.Sleep(50 * time.Millisecond)
+	if received := atomic.LoadInt32(&server.received); received != 2 {
+		t.Errorf("server received %d requests, want 2: a timed-out request was sent again", received)
+	}
+}
+
+func TestSnarkyAIHandlerKeepsSessionsApart(t *testing.T) {
+	path := filepath.Join(t.TempDir(), "snarky.sock")
+	server := startFakeSnarkyServer(t, path)
+	saved := snarkyClient
+	snarkyClient = NewSnarkyRPCClient(path, 2)
+	defer func() { snarkyClient.Close(); snarkyClient = saved }()
+
+	post := func(body string, cookies ...*http.Cookie) *httptest.ResponseRecorder {
+		req := httptest.NewRequest(http.MethodPost, "/snarky", strings.NewReader(body))
+		for _, cookie := range cookies {
+			req.AddCookie(cookie)
+		}
+		recorder := httptest.NewRecorder()
+		SnarkyAIHandler(recorder, req)
+		if recorder.Code != http.StatusOK {
+			t.Fatalf("POST %s: status %d", body, recorder.Code)
+		}
+		return recorder
+	}
+
+	if recorder := post(`{"input": "Hello?", "session": "abc"}`); len(recorder.Result().Cookies()) != 0 {
+		t.Error("a request naming its session was given a cookie")
+	}
+	if got := server.lastSession(); got != "abc" {
+		t.Errorf("session = %q, want %q", got, "abc")
+	}
+
+	cookies := post(`{"input": "Hello?"}`).Result().Cookies()
+	if len(cookies) != 1 || cookies[0].Name != snarkySessionCookie || cookies[0].Value == "" {
+		t.Fatalf("cookies = %v, want a new %s cookie", cookies, snarkySessionCookie)
+	}
+	first := server.lastSession()
+	if first != cookies[0].Value {
+		t.Errorf("session = %q, want the cookie's %q", first, cookies[0].Value)
+	}
+	if recorder := post(`{"input": "Hello?"}`, cookies[0]); len(recorder.Result().Cookies()) != 0 {
+		t.Error("a request with a session cookie was given another")
+	}
+	if got := server.lastSession(); got != first {
+		t.Errorf("session with cookie = %q, want %q", got, first)
+	}
+	post(`{"input": "Hello?"}`)
+	if got := server.lastSession(); got == first {
+		t.Error("two callers without cookies shared a session")
+	}
+}
@@ -0,0 +1,231 @@
+"""
+Long-lived SnarkyAI worker speaking line-delimited JSON over stdin/stdout.
+
+Run it from the challenges directory:
+
+    python -m snarky_worker [--sessions sessions.db] [--languages en,es] [--lexicon-size 20000]
+                            [--seed 42] [--metrics] [--early-exit]
+                            [--compact-sessions] [--max-sessions N]
+                            [--repeat-entries N] [--repeat-bytes N] [--repeat-ttl SECONDS]
+
+Every request is a single JSON object on its own line:
+
+    {"id": 1, "method": "get_response", "params": {"input": "why is the sky blue?", "session": "abc"}}
+    {"id": 2, "method": "get_opening_prompt"}
+    {"id": 7, "method": "get_opening_prompts", "params": {"count": 50}}
+    {"id": 3, "method": "reload_registry", "params": {"if_changed": true}}
+    {"id": 4, "method": "cache_stats"}
+    {"id": 8, "method": "session_stats"}
+    {"id": 5, "method": "metrics"}
+    {"id": 6, "method": "shutdown"}
+
+Every reply is a single JSON object on its own line carrying the same id:
+
+    {"id": 1, "result": "Why? WHY?! Because I said so..."}
+    {"id": 9, "error": "Unknown method: 'frobnicate'"}
+
+Requests are answered strictly in the order they arrive, so a caller may
+pipeline as many requests as it likes and match replies back up by id.
+The optional "session" param keeps each conversation's repeat history apart;
+requests without one share the worker's default conversation. Sessions live in
+an in-process LRU of --max-sessions unless --sessions points at a SQLite file
+(see SQLiteSessionStore for its per-request cost), and are forgotten after an
+hour idle. --compact-sessions keeps each one as a CompactSession for servers
+holding very many conversations (see CompactSession in session_store.py for
+what that costs). Otherwise --repeat-entries, --repeat-bytes and --repeat-ttl
+set each session's RepeatTracker budget (see repeat_tracker.py);
+"session_stats" reports the store's session count and, in memory, the
+trackers' summed stats. --languages, --lexicon-size and --lexicon-mode pick
+the nonsense check's word lists (see lexicon.py); each language's list is only
+mapped once a request needs it.
+"reload_registry" re-reads the registry file the worker started with (never a
+path sent over the wire); with "if_changed" it only does so if the file's
+modification time moved, answering "unchanged" otherwise. A file that fails to
+load is an error reply and the old content stays in place.
+--seed makes the worker's reply picks repeat exactly from run to run.
+--metrics times every get_response (see snarky_metrics.py); "metrics" then
+returns the snapshot dict. --early-exit turns on SnarkyAI's early_exit reply
+selection.
+The worker exits after answering "shutdown" or when stdin is closed.
+"""
+import argparse
+import json
+import sys
+
+import lexicon
+from SnarkyAI import SnarkyAI
+from session_store import open_session_store, repeat_options
+from snarky_metrics import SnarkyMetrics
+from snarky_prompts import MAX_TAKE, PromptService
+
+
+class SnarkyWorker:
+    """Serves SnarkyAI requests from one process-wide instance."""
+    def __init__(self, session_store=None, seed=None, thread_safe=False, metrics=None,
+                 early_exit=False):
+        # Built once, so every request only pays for the text processing.
+        # Servers calling handle() from several threads pass thread_safe=True.
+        self.ai = SnarkyAI(session_store=session_store, seed=seed, thread_safe=thread_safe,
+                           metrics=metrics, early_exit=early_exit)
+        # Bulk greetings come pre-rendered, drawn from the engine's own generator.
+        self.prompts = PromptService(self.ai.registry, rng=self.ai.rng)
+        self.running = True
+
+        self.methods = {
+            "get_opening_prompt": self._get_opening_prompt,
+            "get_opening_prompts": self._get_opening_prompts,
+            "get_response": self._get_response,
+            "ping": self._ping,
+            "cache_stats": self._cache_stats,
+            "session_stats": self._session_stats,
+            "metrics": self._metrics,
+            "reload_registry": self._reload_registry,
+            "shutdown": self._shutdown,
+        }
+
+    def handle(self, request):
+        """Dispatches one decoded request and returns the reply dict."""
+        if not isinstance(request, dict):
+            return {"id": None, "error": "Request must be a JSON object"}
+
+        request_id = request.get("id")
+        method = self.methods.get(request.get("method"))
+        if method is None:
+            return {"id": request_id, "error": f"Unknown method: {request.get('method')!r}"}
+
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            return {"id": request_id, "error": "'params' must be a JSON object"}
+
+        try:
+            return {"id": request_id, "result": method(params)}
+        except (KeyError, TypeError, ValueError, OSError) as exc:
+            return {"id": request_id, "error": f"{type(exc).__name__}: {exc}"}
+
+    def handle_line(self, line):
+        """Decodes one request line and returns the encoded reply line."""
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            reply = {"id": None, "error": f"Invalid JSON: {exc}"}
+        else:
+            reply = self.handle(request)
+        return json.dumps(reply) + "\n"
+
+    def serve(self, stdin, stdout):
+        """Answers requests from stdin until shutdown or end of input."""
+        for line in stdin:
+            if not line.strip():
+                continue
+            stdout.write(self.handle_line(line))
+            stdout.flush()
+            if not self.running:
+                break
+
+    # --- METHODS ---
+
+    def _get_opening_prompt(self, params):
+        return self.ai.get_opening_prompt()
+
+    def _get_opening_prompts(self, params):
+        count = params.get("count", 1)
+        if not isinstance(count, int) or isinstance(count, bool) or not 0 <= count <= MAX_TAKE:
+            raise ValueError(f"'count' must be an integer from 0 to {MAX_TAKE}")
+        return self.prompts.take(count)
+
+    def _get_response(self, params):
+        user_input = params["input"]
+        if not isinstance(user_input, str):
+            raise TypeError("'input' must be a string")
+        session_id = params.get("session")
+        if session_id is not None and not isinstance(session_id, str):
+            raise TypeError("'session' must be a string")
+        return self.ai.get_response(user_input, session_id=session_id)
+
+    def _reload_registry(self, params):
+        if "path" in params:
+            raise ValueError("'path' is not accepted; the worker reloads the file it started with")
+        if params.get("if_changed") and not self.ai.registry.is_stale():
+            return "unchanged"
+        self.ai.reload_registry()
+        self.prompts = PromptService(self.ai.registry, rng=self.ai.rng)
+        return "reloaded"
+
+    def _ping(self, params):
+        return "pong"
+
+    def _cache_stats(self, params):
+        return self.ai.response_cache.stats()
+
+    def _session_stats(self, params):
+        return self.ai.session_store.stats()
+
+    def _metrics(self, params):
+        if self.ai.metrics is None:
+            raise ValueError("metrics are disabled; start the worker with --metrics")
+        return self.ai.metrics.snapshot()
+
+    def _shutdown(self, params):
+        self.running = False
+        return "bye"
+
+
+def add_repeat_arguments(parser):
+    """The RepeatTracker budget flags shared by the worker and the RPC server."""
+    parser.add_argument("--repeat-entries", type=int, metavar="N",
+                        help="distinct inputs each session counts repeats for, at least 10 "
+                             "(default: 256)")
+    parser.add_argument("--repeat-bytes", type=int, metavar="N",
+                        help="approximate byte budget of each session's repeat counts")
+    parser.add_argument("--repeat-ttl", type=float, metavar="SECONDS",
+                        help="forget an input's repeat count after this long unseen")
+
+
+def parse_repeat_arguments(parser, args):
+    """session_options from add_repeat_arguments' flags."""
+    try:
+        options = repeat_options(args.repeat_entries, args.repeat_bytes, args.repeat_ttl)
+    except ValueError as exc:
+        parser.error(f"--repeat-entries: {exc}")
+    if options and args.compact_sessions:
+        parser.error("--repeat-* settings do not apply to --compact-sessions")
+    return options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sessions", metavar="PATH", help="SQLite file holding session state")
+    parser.add_argument("--max-sessions", type=int, default=10000,
+                        help="sessions kept in memory without --sessions (default: 10000)")
+    parser.add_argument("--compact-sessions", action="store_true",
+                        help="store sessions as hashed CompactSessions")
+    add_repeat_arguments(parser)
+    parser.add_argument("--languages", metavar="LANGS",
+                        help="comma-separated lexicon languages, first is the fallback "
+                             "(default: $SNARKY_LANGUAGES or en)")
+    parser.add_argument("--lexicon-size", type=int, metavar="N",
+                        help="top-N words per language (default: $SNARKY_LEXICON_SIZE or 50000)")
+    parser.add_argument("--lexicon-mode", choices=("exact", "bloom"),
+                        help="lexicon file kind (default: $SNARKY_LEXICON_MODE or exact)")
+    parser.add_argument("--seed", type=int, help="seed the reply picks, for reproducible load tests")
+    parser.add_argument("--metrics", action="store_true", help="time every get_response")
+    parser.add_argument("--early-exit", action="store_true",
+                        help="pick each reply before building its candidate pool (SnarkyAI early_exit)")
+    args = parser.parse_args(argv)
+    session_options = parse_repeat_arguments(parser, args)
+
+    languages = args.languages.split(",") if args.languages else None
+    lexicon.configure(languages, args.lexicon_size, args.lexicon_mode)
+    session_store = open_session_store(args.sessions, args.compact_sessions, args.max_sessions,
+                                       session_options)
+
+    # Pin the pipes to UTF-8 so emoji survive regardless of the host locale.
+    sys.stdin.reconfigure(encoding="utf-8")
+    sys.stdout.reconfigure(encoding="utf-8")
+    metrics = SnarkyMetrics() if args.metrics else None
+    worker = SnarkyWorker(session_store, args.seed, metrics=metrics, early_exit=args.early_exit)
+    worker.serve(sys.stdin, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Tests for the SnarkyAI modules. Run them from the challenges directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+# The engine modules are flat files in the challenges directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
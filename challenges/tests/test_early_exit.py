@@ -0,0 +1,149 @@
+import math
+import os
+import random
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from SnarkyAI import SnarkyAI
+from response_cache import ResponseCache
+
+# Inputs hitting several checks and topics at once.
+INPUTS = (
+    "what about money, travel, food, music and my cat?",
+    "thx for ur help plz, how do i get rich and famous?",
+    "Hwat is tha fooniest anminal to look at",
+    "WHY IS THE AI SO DUMB ABOUT GAMES AND PETS???",
+    "your wrong about history and the future of love",
+    "explain math and health and diy to me",
+    "tell me about cats",
+    "u kno wat i meen",
+)
+CHALLENGES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DRAWS_PER_REPLY = 400
+ALPHA = 0.001
+
+
+# --- STATISTICS ---
+
+def exact_distribution(candidates):
+    """
+    Maps every reply to its exact probability under the default mode: each
+    check's pick and each keyword reply is one slot, and a pick that is a pool
+    splits its slot evenly across its replies.
+    """
+    picks, spread = candidates
+    slot = 1 / (len(picks) + len(spread))
+    chances = Counter()
+    for pick in picks:
+        if isinstance(pick, str):
+            chances[pick] += slot
+        else:
+            for reply in pick:
+                chances[reply] += slot / len(pick)
+    for reply in spread:
+        chances[reply] += slot
+    return chances
+
+
+def chi_square(observed, chances, draws):
+    """Pearson's statistic and degrees of freedom for observed counts vs chances."""
+    if any(reply not in chances for reply in observed):
+        return math.inf, len(chances) - 1
+    statistic = 0.0
+    for reply, chance in chances.items():
+        expected = chance * draws
+        statistic += (observed.get(reply, 0) - expected) ** 2 / expected
+    return statistic, len(chances) - 1
+
+
+def chi_square_sf(statistic, dof):
+    """P(X >= statistic) for X ~ chi-square(dof): the regularized upper gamma Q(dof/2, x/2)."""
+    if math.isinf(statistic):
+        return 0.0
+    if dof <= 0:
+        return 1.0
+    a, x = dof / 2, statistic / 2
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        # Series for the lower gamma P(a, x); Q = 1 - P.
+        term = total = 1 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1 - total * math.exp(log_prefix))
+    # Lentz's continued fraction for Q(a, x).
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def test_chi_square_sf_matches_known_values():
+    assert chi_square_sf(3.841, 1) == pytest.approx(0.05, abs=1e-4)
+    assert chi_square_sf(18.307, 10) == pytest.approx(0.05, abs=1e-4)
+    assert chi_square_sf(0.0, 5) == 1.0
+
+
+# --- SAMPLING ---
+
+@pytest.mark.parametrize("early_exit", [False, True], ids=["default", "early_exit"])
+@pytest.mark.parametrize("seed, raw", list(enumerate(INPUTS)))
+def test_replies_follow_the_default_distribution(early_exit, seed, raw):
+    """The default mode runs too, as a control for the test itself."""
+    chances = exact_distribution(SnarkyAI()._collect_candidates(raw, raw.lower()))
+    ai = SnarkyAI(early_exit=early_exit)
+    candidates = ai._collect_candidates(raw, raw.lower())
+    rng = random.Random(seed)
+    draws = DRAWS_PER_REPLY * len(chances)
+    observed = Counter(ai._select(candidates, rng) for _ in range(draws))
+
+    statistic, dof = chi_square(observed, chances, draws)
+    assert chi_square_sf(statistic, dof) >= ALPHA, (statistic, dof)
+
+
+def test_modes_can_share_a_response_cache():
+    cache = ResponseCache()
+    default = SnarkyAI(seed=1, response_cache=cache)
+    early = SnarkyAI(seed=1, response_cache=cache, early_exit=True)
+    for round, ai in enumerate((default, early, default, early)):
+        for i, raw in enumerate(INPUTS):
+            assert ai.get_response(raw, session_id=f"{round}-{i}")
+    # Each mode misses once per input and hits on its second round.
+    assert cache.misses and cache.hits == cache.misses
+
+
+def test_seeded_early_exit_replies_repeat_across_hash_seeds():
+    """Matched topics come back as a set, whose order depends on PYTHONHASHSEED."""
+    script = (
+        "from SnarkyAI import SnarkyAI\n"
+        "ai = SnarkyAI(seed=7, early_exit=True)\n"
+        f"for i, raw in enumerate({INPUTS!r}):\n"
+        "    print(ai.get_response(raw, session_id=str(i)))\n"
+    )
+    outputs = [
+        subprocess.run([sys.executable, "-c", script], cwd=CHALLENGES_DIR, capture_output=True,
+                       text=True, check=True, env={**os.environ, "PYTHONHASHSEED": hash_seed}).stdout
+        for hash_seed in ("1", "2")
+    ]
+    assert outputs[0] and outputs[0] == outputs[1]
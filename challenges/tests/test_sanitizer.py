@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.sanitizer import build_corpus, reference_sanitize
+from manual_sanitation import DEFAULT_MAX_LEN, sanitize_expressive_fort_knox
+
+
+@pytest.mark.parametrize("max_len", [300, DEFAULT_MAX_LEN])
+def test_matches_the_reference_sanitizer(max_len):
+    """The precompiled, fused passes must agree byte for byte with the originals."""
+    mismatches = [
+        text for text in build_corpus(20000)
+        if sanitize_expressive_fort_knox(text, max_len) != reference_sanitize(text, max_len)
+    ]
+    assert mismatches == []
+
+
+def test_none_becomes_empty():
+    assert sanitize_expressive_fort_knox(None) == reference_sanitize(None) == ""
@@ -0,0 +1,81 @@
+import pytest
+
+from repeat_tracker import RepeatTracker
+from session_store import (
+    HISTORY_SIZE, CompactSession, MemorySessionStore, SessionState, SQLiteSessionStore,
+    open_session_store, repeat_options,
+)
+
+
+@pytest.mark.parametrize("store", [
+    MemorySessionStore(session_options={"max_entries": 2}),
+    SQLiteSessionStore(session_options={"max_entries": 2}),
+], ids=["memory", "sqlite"])
+def test_stores_build_and_restore_sessions_with_their_options(store):
+    state = store.load("abc")
+    for text in ("one", "two", "three"):
+        state.observe(text)
+    store.save("abc", state)
+
+    restored = store.load("abc")
+    assert restored.repeat_count.max_entries == 2
+    assert restored.stats()["entries"] == 2
+    assert store.stats()["sessions"] == 1
+
+
+def test_memory_store_sums_tracker_stats():
+    store = MemorySessionStore(session_options=repeat_options(max_entries=HISTORY_SIZE))
+    for session_id in ("a", "b"):
+        state = store.load(session_id)
+        for n in range(HISTORY_SIZE + 1):
+            state.observe(f"why {n}?")
+        store.save(session_id, state)
+
+    stats = store.stats()
+    assert stats["sessions"] == 2
+    assert stats["repeat_entries"] == 2 * HISTORY_SIZE
+    assert stats["repeat_evictions"] == 2
+
+
+def test_repeat_options_keep_the_whole_history_counted():
+    with pytest.raises(ValueError):
+        repeat_options(max_entries=HISTORY_SIZE - 1)
+
+
+# A tracker that forgot an input the history still holds must not restart its
+# count at 1, which SnarkyAI would answer with the "asked 4+ times" replies.
+
+def test_second_ask_after_entry_eviction_counts_two():
+    state = SessionState(max_entries=2)
+    assert [state.observe(text) for text in ("a", "b", "c", "a")] == [0, 0, 0, 2]
+    assert state.observe("a") == 3
+
+
+def test_second_ask_after_byte_eviction_counts_two():
+    state = SessionState(max_bytes=1)
+    assert [state.observe(text) for text in ("a", "b", "a")] == [0, 0, 2]
+
+
+def test_second_ask_after_ttl_expiry_counts_two():
+    now = [0.0]
+    state = SessionState(repeat_count=RepeatTracker(ttl=60, clock=lambda: now[0]))
+    assert state.observe("a") == 0
+    now[0] = 61.0
+    assert state.observe("a") == 2
+
+
+def test_compact_sessions_take_no_tracker_options():
+    assert isinstance(open_session_store(compact=True).new_session(), CompactSession)
+    with pytest.raises(ValueError):
+        open_session_store(compact=True, session_options={"max_entries": 8})
+
+
+def test_sqlite_store_purges_expired_rows_as_it_saves():
+    now = [0.0]
+    store = SQLiteSessionStore(ttl=60, clock=lambda: now[0], purge_every=3)
+    store.save("old", store.new_session())
+    now[0] = 100.0
+    store.save("a", store.new_session())
+    assert store.stats()["sessions"] == 2
+    store.save("b", store.new_session())
+    assert store.stats()["sessions"] == 2
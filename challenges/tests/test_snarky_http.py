@@ -0,0 +1,96 @@
+import asyncio
+import json
+import threading
+
+from snarky_http import SnarkyHTTPServer
+from snarky_prompts import PromptService
+
+
+class StallingAI:
+    """Stands in for SnarkyAI: get_response blocks until release is set."""
+    metrics = None
+
+    def __init__(self, stall=False):
+        self.release = threading.Event()
+        if not stall:
+            self.release.set()
+        self.calls = 0
+
+    def get_response(self, user_input, session_id=None):
+        self.calls += 1
+        self.release.wait(5)
+        return f"echo {user_input}"
+
+
+async def request(reader, writer, method, path, body=None, version="HTTP/1.1", headers=""):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} {version}\r\nContent-Length: {len(data)}\r\n{headers}\r\n".encode()
+                 + data)
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    fields = dict(line.split(": ", 1) for line in head[1:] if line)
+    payload = await reader.readexactly(int(fields["Content-Length"]))
+    return int(head[0].split(" ")[1]), fields, json.loads(payload)
+
+
+def serve(ai, scenario, **options):
+    """Runs scenario(server, connect) against a live server on a free port."""
+    async def main():
+        server = SnarkyHTTPServer(ai=ai, prompts=PromptService(seed=0), threads=4, **options)
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await scenario(server, lambda: asyncio.open_connection("127.0.0.1", port))
+        finally:
+            ai.release.set()
+            server.close()
+    return asyncio.run(main())
+
+
+def test_keep_alive_and_bad_requests():
+    async def scenario(server, connect):
+        reader, writer = await connect()
+        status, fields, body = await request(reader, writer, "POST", "/response", {"nope": 1})
+        assert status == 400 and fields["Connection"] == "keep-alive"
+        status, _, body = await request(reader, writer, "POST", "/response", {"input": "hi"})
+        assert (status, body) == (200, {"response": "echo hi"})
+        status, _, _ = await request(reader, writer, "GET", "/prompt?count=lots")
+        assert status == 400
+
+        reader, writer = await connect()
+        status, fields, _ = await request(reader, writer, "GET", "/prompt", version="HTTP/1.0")
+        assert status == 200 and fields["Connection"] == "close"
+        assert await reader.read() == b""
+    serve(StallingAI(), scenario)
+
+
+def test_overload_answers_503():
+    async def scenario(server, connect):
+        first = asyncio.ensure_future(
+            request(*await connect(), "POST", "/response", {"input": "slow"}))
+        await asyncio.sleep(0.05)
+        status, fields, _ = await request(*await connect(), "POST", "/response", {"input": "more"})
+        assert status == 503 and fields["Retry-After"] == "1"
+        server.ai.release.set()
+        assert (await first)[0] == 200
+    serve(StallingAI(stall=True), scenario, concurrency=1, max_pending=1)
+
+
+def test_timed_out_work_keeps_its_slot():
+    async def scenario(server, connect):
+        status, _, _ = await request(*await connect(), "POST", "/response", {"input": "slow"})
+        assert status == 504
+        # The first call still runs, so it still holds the only slot.
+        assert server.pending == 1
+        status, _, _ = await request(*await connect(), "POST", "/response", {"input": "queued"})
+        assert status == 504 and server.ai.calls == 1
+
+        server.ai.release.set()
+        for _ in range(100):
+            if server.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        status, _, body = await request(*await connect(), "POST", "/response", {"input": "fast"})
+        assert (status, body) == (200, {"response": "echo fast"})
+        assert server.stats()["timed_out"] == 2
+    serve(StallingAI(stall=True), scenario, concurrency=1, max_pending=2, timeout=0.1)
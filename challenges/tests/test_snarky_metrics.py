@@ -0,0 +1,15 @@
+from SnarkyAI import SnarkyAI
+from snarky_metrics import SnarkyMetrics
+
+
+def test_matches_are_counted_on_cache_hits():
+    metrics = SnarkyMetrics()
+    ai = SnarkyAI(seed=1, metrics=metrics)
+    for session in ("a", "b", "c"):
+        ai.get_response("why is the sky blue?", session_id=session)
+
+    snapshot = metrics.snapshot()
+    assert ai.response_cache.hits == 2
+    assert snapshot["check_hits"]["keywords"] == 3
+    assert snapshot["topics"] and all(count == 3 for count in snapshot["topics"].values())
+    assert snapshot["checks"]["keywords"]["count"] == 1
@@ -0,0 +1,125 @@
+import sys
+import time
+
+import pytest
+
+from snarky_pool import (
+    PoolBusyError, PoolDrainingError, SnarkyPool, WorkerCrashedError, WorkerUnavailableError,
+)
+
+# A stand-in for snarky_worker.py speaking the same protocol, with methods to
+# stall and to die on demand.
+FAKE_WORKER = """
+import json, os, sys, time
+for line in sys.stdin:
+    request = json.loads(line)
+    method, params = request["method"], request.get("params") or {}
+    if method == "crash":
+        os._exit(3)
+    if method == "sleep":
+        time.sleep(params["seconds"])
+    result = os.getpid() if method == "pid" else "bye" if method == "shutdown" else "ok"
+    sys.stdout.write(json.dumps({"id": request["id"], "result": result}) + "\\n")
+    sys.stdout.flush()
+    if method == "shutdown":
+        break
+"""
+FAKE_COMMAND = (sys.executable, "-c", FAKE_WORKER)
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def pool():
+    pool = SnarkyPool(size=1, max_pending=2, command=FAKE_COMMAND, backoff=0.01)
+    yield pool
+    pool.close(timeout=1)
+
+
+def test_crashed_worker_fails_its_requests_and_restarts(pool):
+    pid = pool.submit("pid").result(5)
+    with pytest.raises(WorkerCrashedError):
+        pool.submit("crash").result(5)
+
+    wait_until(lambda: pool.stats()[0]["available"])
+    assert pool.submit("pid").result(5) != pid
+    assert pool.stats()[0]["restarts"] == 1
+
+
+def test_crash_loop_backs_off_and_refuses_requests():
+    pool = SnarkyPool(size=1, command=(sys.executable, "-c", "raise SystemExit(3)"),
+                      backoff=0.05, max_backoff=0.2, max_failures=3)
+    try:
+        time.sleep(1.0)
+        stats = pool.stats()[0]
+        # Without backoff this is a fork loop with a hundred restarts a second.
+        assert 2 <= stats["restarts"] <= 8
+        assert stats["failures"] >= 3 and not stats["available"]
+        with pytest.raises(WorkerUnavailableError):
+            pool.submit("pid")
+    finally:
+        pool.close(timeout=1)
+
+
+def test_max_pending_rejects_excess_requests(pool):
+    slow = [pool.submit("sleep", seconds=0.3) for _ in range(2)]
+    with pytest.raises(PoolBusyError):
+        pool.submit("pid")
+    assert [future.result(5) for future in slow] == ["ok", "ok"]
+    assert pool.submit("pid").result(5)
+
+
+def test_drain_waits_for_in_flight_requests(pool):
+    future = pool.submit("sleep", seconds=0.2)
+    assert pool.drain()
+    assert future.done()
+    with pytest.raises(PoolDrainingError):
+        pool.submit("pid")
+    pool.resume()
+    assert pool.submit("pid").result(5)
+
+
+def test_drain_times_out(pool):
+    future = pool.submit("sleep", seconds=0.5)
+    assert not pool.drain(timeout=0.05)
+    pool.resume()
+    assert future.result(5) == "ok"
+
+
+def test_reload_replaces_every_worker(pool):
+    pid = pool.submit("pid").result(5)
+    assert pool.reload(timeout=5)
+    assert pool.submit("pid").result(5) != pid
+    assert pool.stats()[0]["restarts"] == 0
+
+
+def test_reload_gives_up_while_requests_run(pool):
+    pid = pool.submit("pid").result(5)
+    future = pool.submit("sleep", seconds=0.5)
+    assert not pool.reload(timeout=0.05)
+    assert future.result(5) == "ok"
+    assert pool.submit("pid").result(5) == pid
+
+
+def test_broadcast_reaches_every_worker():
+    pool = SnarkyPool(size=3, max_pending=1, command=FAKE_COMMAND)
+    try:
+        blocked = pool.submit("sleep", session_id="abc", seconds=0.2)
+        pids = [future.result(5) for future in pool.broadcast("pid")]
+        assert len(set(pids)) == 3
+        assert blocked.result(5) == "ok"
+    finally:
+        pool.close(timeout=1)
+
+
+def test_close_fails_requests_of_a_killed_worker(pool):
+    future = pool.submit("sleep", seconds=30)
+    pool.close(timeout=0.1)
+    with pytest.raises(WorkerCrashedError):
+        future.result(5)
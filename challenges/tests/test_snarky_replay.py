@@ -0,0 +1,55 @@
+import io
+import json
+import sys
+
+import pytest
+
+from SnarkyAI import SnarkyAI
+from snarky_pool import SnarkyPool
+from snarky_replay import replay
+
+
+def test_undecodable_lines_become_error_records():
+    log = io.BytesIO(b'{"input": "hi?"}\n{"input": "caf\xe9"}\n\xff\n{"id": 7, "input": "why?"}\n')
+    out = io.StringIO()
+    written, _ = replay(log, out, SnarkyAI(seed=0))
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert written == 4
+    assert [record["line"] for record in records] == [1, 2, 3, 4]
+    assert "response" in records[0] and records[3]["id"] == 7
+    assert records[1]["error"].startswith("Invalid UTF-8")
+    assert records[2]["error"].startswith("Invalid UTF-8")
+
+
+# Answers like snarky_worker.py, but exits when asked about "crash".
+CRASHING_WORKER = """
+import json, os, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    params = request.get("params") or {}
+    if params.get("input") == "crash":
+        os._exit(3)
+    sys.stdout.write(json.dumps({"id": request["id"], "result": "ok"}) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+@pytest.mark.parametrize("ordered", [True, False], ids=["ordered", "unordered"])
+def test_crashing_worker_fails_records_not_the_replay(ordered):
+    inputs = ["one", "crash", "two", "three", "four"]
+    log = io.BytesIO(b"".join(json.dumps({"input": text}).encode() + b"\n" for text in inputs))
+    out = io.StringIO()
+    # A long backoff keeps the worker down for the rest of the replay.
+    pool = SnarkyPool(size=1, command=(sys.executable, "-c", CRASHING_WORKER), backoff=30)
+    try:
+        written, _ = replay(log, out, pool=pool, window=1, ordered=ordered)
+    finally:
+        pool.close(timeout=1)
+
+    records = sorted((json.loads(line) for line in out.getvalue().splitlines()),
+                     key=lambda record: record["line"])
+    assert written == len(inputs)
+    assert [record["line"] for record in records] == [1, 2, 3, 4, 5]
+    assert records[0]["response"] == "ok"
+    assert all("error" in record for record in records[1:])
@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import pytest
+
+from snarky_registry import DEFAULT_PATH, load_registry
+from snarky_worker import SnarkyWorker
+
+
+@pytest.fixture
+def worker(tmp_path):
+    path = tmp_path / "snarky_responses.json"
+    shutil.copy(DEFAULT_PATH, path)
+    worker = SnarkyWorker(seed=0)
+    worker.ai.reload_registry(str(path))
+    return worker, path
+
+
+def reload_registry(worker, **params):
+    return worker.handle({"id": 1, "method": "reload_registry", "params": params})
+
+
+def test_reload_registry_refuses_paths_from_the_wire(worker):
+    worker, _ = worker
+    reply = reload_registry(worker, path="/etc/passwd")
+    assert "error" in reply and "'path'" in reply["error"]
+
+
+def test_reload_registry_survives_a_missing_or_broken_file(worker):
+    worker, path = worker
+    registry = worker.ai.registry
+
+    os.unlink(path)
+    assert reload_registry(worker)["error"].startswith("FileNotFoundError")
+    path.write_text("{ not json")
+    assert reload_registry(worker)["error"].startswith("JSONDecodeError")
+
+    assert worker.ai.registry is registry
+    assert "result" in worker.handle({"id": 2, "method": "get_response", "params": {"input": "hi?"}})
+
+
+def test_reload_registry_if_changed(worker):
+    worker, path = worker
+    assert reload_registry(worker, if_changed=True) == {"id": 1, "result": "unchanged"}
+
+    os.utime(path, ns=(0, load_registry(str(path)).mtime + 10**9))
+    assert reload_registry(worker, if_changed=True) == {"id": 1, "result": "reloaded"}
+    assert reload_registry(worker, if_changed=True) == {"id": 1, "result": "unchanged"}
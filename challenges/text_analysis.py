@@ -0,0 +1,58 @@
+"""
+One-pass pre-analysis of a sanitized SnarkyAI input.
+
+Every check in SnarkyAI used to rescan the input on its own: a findall for the
+nonsense check, a regex per misspelling, more for the grammar checks. Instead
+the input is tokenized once into a TextAnalysis and the checks read from it,
+so most of them come down to set lookups and flag tests:
+
+    analysis = TextAnalysis("Wat is ur name")
+    analysis.token_set          # {'wat', 'is', 'ur', 'name'}
+    analysis.ascii_words        # ['wat', 'name']  (what the nonsense check scores)
+    analysis.has_upper          # True
+    analysis.ends_with_punctuation   # False
+
+Tokens are TOKEN_RE matches over the lower-cased text, the same tokens
+KeywordMatcher scans, so the keyword check reuses them instead of tokenizing again.
+The keyword check leaves the topics it matched in analysis.topics.
+"""
+import re
+
+from keyword_matcher import TOKEN_RE
+
+_LOWER_RE = re.compile(r"[a-z]")
+_UPPER_RE = re.compile(r"[A-Z]")
+
+
+class TextAnalysis:
+    """Tokens, word sets and style flags for one input, computed once."""
+    __slots__ = (
+        "raw", "normalized", "tokens", "words", "token_set", "ascii_words",
+        "is_ascii", "is_upper", "has_lower", "has_upper",
+        "ends_with_punctuation", "emphatic_punctuation", "topics",
+    )
+
+    def __init__(self, raw, normalized=None):
+        self.raw = raw
+        self.normalized = normalized if normalized is not None else raw.lower()
+
+        # --- TOKENS ---
+        # Maximal \w runs, exactly what \b delimits in the old per-check regexes.
+        self.tokens = list(TOKEN_RE.finditer(self.normalized))
+        self.words = [token.group() for token in self.tokens]
+        self.token_set = set(self.words)
+        # Same words as re.findall(r'\b[a-z]{3,}\b', normalized).
+        self.ascii_words = [
+            word for word in self.words if len(word) > 2 and word.isascii() and word.isalpha()
+        ]
+
+        # --- STYLE FLAGS (over the raw, case-preserving text) ---
+        self.is_ascii = raw.isascii()
+        self.is_upper = raw.isupper()
+        self.has_lower = _LOWER_RE.search(raw) is not None
+        self.has_upper = _UPPER_RE.search(raw) is not None
+        self.ends_with_punctuation = raw.strip().endswith(("?", "!", "."))
+        self.emphatic_punctuation = "???" in raw or "!!!" in raw or "?!" in raw
+
+        # Filled in by SnarkyAI's keyword check.
+        self.topics = ()